@@ -0,0 +1,120 @@
+"""
+Compare the row-wise ingest path (fetchall + dict(zip) + process_item_data)
+with the columnar path (per-column processing via process_columns).
+
+Rows are synthesized from the JSON records under data/, shaped the way
+Snowflake returns them (upper-case column names, JSON fields as strings).
+
+Run from the repository root:
+    python -m benchmarks.bench_ingest [--rows 10000 100000]
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import time
+
+from config.settings import DATA_ROOT
+from loaders.item_processing import JSON_FIELDS, process_columns, process_item_data
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def load_sample_records():
+    """
+    Load the local catalog records with JSON fields serialized to strings,
+    as Snowflake returns them, so both paths pay for parsing them
+    """
+    records = []
+    for path in sorted(glob.glob(os.path.join(DATA_ROOT, "*", "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+
+        raw = {}
+        for key, value in record.items():
+            if key in JSON_FIELDS and isinstance(value, str):
+                try:
+                    value = ast.literal_eval(value)
+                except (ValueError, SyntaxError):
+                    pass
+            if key in JSON_FIELDS and isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            raw[key.upper()] = value
+        records.append(raw)
+    return records
+
+
+def build_result_set(records, num_rows):
+    """Build (column_names, rows) as returned by cursor.description/fetchall()"""
+    column_names = sorted({key for record in records for key in record})
+    rows = [
+        tuple(records[i % len(records)].get(name) for name in column_names)
+        for i in range(num_rows)
+    ]
+    return column_names, rows
+
+
+def run_row_path(column_names, rows):
+    return [process_item_data(dict(zip(column_names, row))) for row in rows]
+
+
+def run_columnar_path(column_names, columns):
+    return process_columns(column_names, columns)
+
+
+def run_arrow_path(column_names, table):
+    columns = [table.column(i).to_pylist() for i in range(len(column_names))]
+    return process_columns(column_names, columns)
+
+
+def timed(fn, *args, repeat=3):
+    """Return (best wall time in seconds, result) over several runs"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = load_sample_records()
+    if not records:
+        raise SystemExit(f"No sample records found under {DATA_ROOT}/")
+
+    print(f"{'rows':>8}  {'row path':>10}  {'columnar':>10}  {'arrow':>10}  speedup")
+    for num_rows in args.rows:
+        column_names, rows = build_result_set(records, num_rows)
+        # Column lists are what the Arrow batches yield after to_pylist()
+        columns = [list(column) for column in zip(*rows)]
+
+        row_time, row_items = timed(run_row_path, column_names, rows, repeat=args.repeat)
+        col_time, col_items = timed(
+            run_columnar_path, column_names, columns, repeat=args.repeat
+        )
+        assert row_items == col_items, "columnar path produced different items"
+
+        arrow_cell = "n/a"
+        if pa is not None:
+            table = pa.table(dict(zip(column_names, columns)))
+            arrow_time, _ = timed(run_arrow_path, column_names, table, repeat=args.repeat)
+            arrow_cell = f"{arrow_time:.3f}s"
+
+        print(
+            f"{num_rows:>8}  {row_time:>9.3f}s  {col_time:>9.3f}s  {arrow_cell:>10}  "
+            f"{row_time / col_time:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
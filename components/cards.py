@@ -1,13 +1,34 @@
 import streamlit as st
 from utils.session import navigate_to_category, navigate_to_item
+from utils.image_pipeline import get_category_image_variants, picture_html
+from utils.image_links import usable_image_indices
+from utils.image_placeholders import item_image_placeholder, placeholder_attrs
+from utils.image_proxy import proxied_image_url
+from utils.wikimedia import original_url, sized_image_url
+from config.settings import IMAGE_CARD_WIDTH
+
+# Rendered width of a category card: full width on mobile, a third of the row otherwise
+CATEGORY_CARD_SIZES = "(max-width: 768px) 100vw, 33vw"
 
 
 def render_category_card(category_id, category_info):
     """Render an enhanced category card with modern styling."""
+    # Prefer resized local derivatives over hotlinking the full-size remote image
+    variants = get_category_image_variants().get(category_id)
+    if variants:
+        image_html = picture_html(
+            variants,
+            category_info["displayTitle"],
+            CATEGORY_CARD_SIZES,
+            fallback_src=category_info["mainCardImage"],
+        )
+    else:
+        image_html = f"""<img src="{category_info['mainCardImage']}" alt="{category_info['displayTitle']}" />"""
+
     st.markdown(f"""
     <div class="category-card">
         <div class="card-image-container">
-            <img src="{category_info['mainCardImage']}" alt="{category_info['displayTitle']}" />
+            {image_html}
         </div>
         <div class="card-content">
             <h3 class="card-title">{category_info['displayTitle']}</h3>
@@ -28,7 +49,9 @@ def render_category_card(category_id, category_info):
 def render_item_card(item, category_id, item_index):
     """Render an enhanced item card with modern styling."""
     # Get image URL with fallback
-    image_url = get_item_image_url(item)
+    image_url = proxied_image_url(
+        get_item_image_url(item, IMAGE_CARD_WIDTH), IMAGE_CARD_WIDTH
+    )
     item_title = item.get("title", "Untitled Item")
     
     # Get preview text from description or other fields
@@ -37,7 +60,7 @@ def render_item_card(item, category_id, item_index):
     st.markdown(f"""
     <div class="item-card">
         <div class="item-image-container">
-            <img src="{image_url}" alt="{item_title}" />
+            <img src="{image_url}" alt="{item_title}" {get_item_image_fallback_attrs(item)} {get_item_image_attrs(item)} />
         </div>
         <div class="card-content">
             <h4 class="card-title" style="font-size: 1.2rem;">{item_title}</h4>
@@ -55,16 +78,50 @@ def render_item_card(item, category_id, item_index):
         navigate_to_item(item)
 
 
-def get_item_image_url(item):
-    """Get the first available image URL or return a styled placeholder."""
-    images = item.get("images", [])
-    if images and len(images) > 0:
-        return images[0]
+def get_item_image_index(item):
+    """Index of the first image not known to be a dead link, or None"""
+    indices = usable_image_indices(item)
+    return indices[0] if indices else None
+
+
+def get_item_image_url(item, width=None):
+    """
+    Get the first available image URL or return a styled placeholder.
+    Images recorded as dead links are skipped. With a width, prefer the
+    smallest stored thumbnail at least that wide.
+    """
+    index = get_item_image_index(item)
+    if index is not None:
+        if width:
+            return sized_image_url(item, index, width)
+        return item["images"][index]
     
     # Return a more attractive placeholder
     return 'https://images.unsplash.com/photo-1578662996442-48f60103fc96?w=400&h=300&fit=crop&crop=center&auto=format&q=60'
 
 
+def get_item_image_attrs(item):
+    """Dimensions and blurred placeholder of the card image, if precomputed"""
+    index = get_item_image_index(item)
+    if index is None:
+        return ""
+    return placeholder_attrs(item_image_placeholder(item, index))
+
+
+def get_item_image_fallback_attrs(item):
+    """
+    onerror fallback to the full-size original, for Commons thumbnails that
+    are wider than their original (Commons refuses those) and not cached yet
+    """
+    index = get_item_image_index(item)
+    if index is None:
+        return ""
+    return (
+        f'data-fallback="{original_url(item["images"][index])}" '
+        'onerror="this.onerror=null;this.src=this.dataset.fallback"'
+    )
+
+
 def get_item_preview(item):
     """Extract a preview text from the item data."""
     # Try different fields for preview text
@@ -92,7 +149,9 @@ def get_item_preview(item):
 
 def render_featured_card(item, category_id, item_index, is_featured=True):
     """Render a featured item card with special styling."""
-    image_url = get_item_image_url(item)
+    image_url = proxied_image_url(
+        get_item_image_url(item, IMAGE_CARD_WIDTH), IMAGE_CARD_WIDTH
+    )
     item_title = item.get("title", "Untitled Item")
     preview_text = get_item_preview(item)
     
@@ -101,7 +160,7 @@ def render_featured_card(item, category_id, item_index, is_featured=True):
     st.markdown(f"""
     <div class="{featured_class}" style="background: linear-gradient(135deg, #FFF9E6, #FFFFFF); border: 2px solid #D4AF37;">
         <div class="item-image-container" style="height: 220px;">
-            <img src="{image_url}" alt="{item_title}" />
+            <img src="{image_url}" alt="{item_title}" {get_item_image_fallback_attrs(item)} {get_item_image_attrs(item)} />
             <div style="position: absolute; top: 10px; right: 10px; background: #4A90E2; color: white; padding: 0.3rem 0.8rem; border-radius: 15px; font-size: 0.8rem; font-weight: 600;">
                 ⭐ Featured
             </div>
@@ -126,7 +185,7 @@ def render_compact_item_list(items, category_id, max_items=6):
     st.markdown("### Recent Additions")
     
     for i, item in enumerate(items[:max_items]):
-        image_url = get_item_image_url(item)
+        image_url = get_item_image_url(item, IMAGE_CARD_WIDTH)
         item_title = item.get("title", "Untitled Item")
         
         col1, col2 = st.columns([1, 3])
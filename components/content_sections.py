@@ -6,7 +6,15 @@ def render_content_sections(selected_item):
     """Render content sections in an organized, visually appealing layout with enhanced UI."""
 
     # Define excluded keys and section priorities
-    excluded_keys = {"images", "title", "generated_at", "last_modified", "references"}
+    excluded_keys = {
+        "images",
+        "image_placeholders",
+        "item_id",
+        "title",
+        "generated_at",
+        "last_modified",
+        "references",
+    }
 
     # Priority sections that should appear first
     priority_sections = [
@@ -1,14 +1,23 @@
 import streamlit as st
 import json
 
+from config.settings import IMAGE_CARD_WIDTH, IMAGE_FULLSCREEN_WIDTH, IMAGE_SLIDER_WIDTH
+from utils.image_links import usable_image_indices
+from utils.image_placeholders import item_image_placeholder, placeholder_background
+from utils.image_proxy import proxied_image_url
+from utils.wikimedia import original_url, sized_image_url
+
 
 def render_image_gallery(selected_item):
     """Render an enhanced image gallery with modern slider and full-screen capability."""
-    images = selected_item.get("images", [])
+    # Skip images recorded as dead links
+    indices = usable_image_indices(selected_item)
 
-    if not images or len(images) == 0:
+    if not indices:
         return
 
+    images = [gallery_image(selected_item, index) for index in indices]
+
     # For single image, display simple view with full-screen option
     if len(images) == 1:
         render_single_image(images[0])
@@ -18,7 +27,28 @@ def render_image_gallery(selected_item):
     render_image_slider(images, selected_item)
 
 
-def render_single_image(image_url):
+def gallery_image(item, index):
+    """
+    URLs for one gallery image: the smallest adequate thumbnail for the
+    slider, the thumbnail strip and fullscreen (served from the local image
+    cache once fetched), plus the original to fall back on if a thumbnail
+    cannot be loaded. "background" paints the precomputed blurred
+    placeholder while the image loads.
+    """
+
+    def sized(width):
+        return proxied_image_url(sized_image_url(item, index, width), width)
+
+    return {
+        "url": sized(IMAGE_SLIDER_WIDTH),
+        "thumb": sized(IMAGE_CARD_WIDTH),
+        "full": sized(IMAGE_FULLSCREEN_WIDTH),
+        "original": original_url(item["images"][index]),
+        "background": placeholder_background(item_image_placeholder(item, index)),
+    }
+
+
+def render_single_image(image):
     """Render a single image with fullscreen capability."""
     st.markdown(
         """
@@ -72,9 +102,9 @@ def render_single_image(image_url):
         }}
     </style>
     
-    <div class="single-image-container" onclick="openFullscreen('{image_url}', 'Main Image')">
-        <img src="{image_url}" style="max-width: 100%; height: auto; display: block;" alt="Main Image">
-        <button class="single-image-fullscreen-btn" onclick="event.stopPropagation(); openFullscreen('{image_url}', 'Main Image')">⛶</button>
+    <div class="single-image-container" onclick="openFullscreen('{image["full"]}', 'Main Image')">
+        <img src="{image["url"]}" data-fallback="{image["original"]}" onerror="this.onerror=null;this.src=this.dataset.fallback" style="max-width: 100%; height: auto; display: block; {image["background"]}" alt="Main Image">
+        <button class="single-image-fullscreen-btn" onclick="event.stopPropagation(); openFullscreen('{image["full"]}', 'Main Image')">⛶</button>
     </div>
     """
 
@@ -86,10 +116,10 @@ def render_image_slider(images, selected_item):
     """Render a multi-image slider with full-screen capability."""
     # Prepare image data for JavaScript
     image_data = []
-    for i, img_url in enumerate(images):
+    for i, image in enumerate(images):
         image_data.append(
             {
-                "url": img_url,
+                **image,
                 "title": f"Image {i+1}",
                 "description": f"Gallery image {i+1} from {selected_item.get('title', 'Item')}",
             }
@@ -103,7 +133,7 @@ def render_image_slider(images, selected_item):
         <div class="streamlit-slider-container">
             <div class="streamlit-main-image-section">
                 <div class="streamlit-main-image-wrapper" onclick="openFullscreenSlider()">
-                    <img id="streamlitMainImage" class="streamlit-main-image" src="{images[0]}" alt="Main Image">
+                    <img id="streamlitMainImage" class="streamlit-main-image" src="{images[0]["url"]}" data-fallback="{images[0]["original"]}" onerror="this.onerror=null;this.src=this.dataset.fallback" style="{images[0]["background"]}" alt="Main Image">
                     <div class="streamlit-image-overlay">
                         <div id="streamlitImageNumber" class="streamlit-image-number">01</div>
                         <div id="streamlitImageTitle" class="streamlit-image-title">Image 1</div>
@@ -567,6 +597,18 @@ def get_slider_javascript(image_data):
         let streamlitCurrentIndex = 0;
         let fullscreenMode = false;
 
+        // Load an image's src into img, showing its placeholder until it
+        // arrives and falling back to the original if a thumbnail fails
+        function streamlitSetImageSource(img, image, src) {{
+            img.style.background = '';
+            if (image.background) img.style.cssText += image.background;
+            img.onerror = function() {{
+                this.onerror = null;
+                this.src = image.original;
+            }};
+            img.src = src;
+        }}
+
         function streamlitInitializeSlider() {{
             if (streamlitImages.length === 0) return;
             
@@ -590,9 +632,10 @@ def get_slider_javascript(image_data):
                 thumbnail.onclick = () => streamlitSetCurrentImage(index);
                 
                 thumbnail.innerHTML = `
-                    <img src="${{image.url}}" alt="Thumbnail ${{index + 1}}" loading="lazy">
+                    <img alt="Thumbnail ${{index + 1}}" loading="lazy">
                     <div class="streamlit-thumbnail-number">${{String(index + 1).padStart(2, '0')}}</div>
                 `;
+                streamlitSetImageSource(thumbnail.querySelector('img'), image, image.thumb);
                 
                 grid.appendChild(thumbnail);
             }});
@@ -626,7 +669,11 @@ def get_slider_javascript(image_data):
             mainImage.style.opacity = '0.7';
             
             setTimeout(() => {{
-                mainImage.src = streamlitImages[streamlitCurrentIndex].url;
+                streamlitSetImageSource(
+                    mainImage,
+                    streamlitImages[streamlitCurrentIndex],
+                    streamlitImages[streamlitCurrentIndex].url
+                );
                 if (imageNumber) imageNumber.textContent = String(streamlitCurrentIndex + 1).padStart(2, '0');
                 if (imageTitle) imageTitle.textContent = streamlitImages[streamlitCurrentIndex].title;
                 if (imageDescription) imageDescription.textContent = streamlitImages[streamlitCurrentIndex].description;
@@ -717,7 +764,11 @@ def get_slider_javascript(image_data):
             const info = document.getElementById('fullscreenInfo');
             
             if (image && streamlitImages[streamlitCurrentIndex]) {{
-                image.src = streamlitImages[streamlitCurrentIndex].url;
+                streamlitSetImageSource(
+                    image,
+                    streamlitImages[streamlitCurrentIndex],
+                    streamlitImages[streamlitCurrentIndex].full
+                );
                 
                 if (info) {{
                     info.innerHTML = `
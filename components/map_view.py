@@ -1,75 +1,99 @@
 import streamlit as st
-import requests
 import os
 from dotenv import load_dotenv
 import random
+from config.settings import STREET_VIEW_CACHE_TTL
+from utils.http_client import http_client
 
 load_dotenv()
 
 
+# Geocoding/Places statuses that are real answers; anything else (quota,
+# denied key, server errors) is raised so the cached lookup does not keep it
+MAPS_ANSWER_STATUSES = {"OK", "ZERO_RESULTS"}
+
+
+class MapsLookupError(Exception):
+    """Raised when a Google Maps API call fails rather than finding nothing."""
+
+
+def maps_api_get(url, params):
+    """GET a Maps web service and return its JSON, raising on failure statuses"""
+    response = http_client.get(url, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if data.get("status") not in MAPS_ANSWER_STATUSES:
+        raise MapsLookupError(
+            f"{url} returned {data.get('status')}: {data.get('error_message', '')}"
+        )
+    return data
+
+
 def get_nearby_places(lat, lng, radius=1000):
-    """Get nearby famous places using Google Places API."""
-    try:
-        base_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
-            "location": f"{lat},{lng}",
-            "radius": radius,
-            "type": "tourist_attraction|landmark|museum|art_gallery",
-            "key": os.getenv("GOOGLE_MAPS_API_KEY"),
-        }
-        response = requests.get(base_url, params=params)
-        data = response.json()
-
-        if data["status"] != "OK":
-            return []
-
-        places = []
-        for place in data.get("results", [])[:2]:  # Get top 2 nearby places
-            location = place["geometry"]["location"]
-            places.append(
-                {"name": place["name"], "lat": location["lat"], "lng": location["lng"]}
-            )
-        return places
-    except Exception:
+    """Get nearby famous places using Google Places API. Failures propagate."""
+    base_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+    params = {
+        "location": f"{lat},{lng}",
+        "radius": radius,
+        "type": "tourist_attraction|landmark|museum|art_gallery",
+        "key": os.getenv("GOOGLE_MAPS_API_KEY"),
+    }
+    data = maps_api_get(base_url, params)
+
+    places = []
+    for place in data.get("results", [])[:2]:  # Get top 2 nearby places
+        location = place["geometry"]["location"]
+        places.append(
+            {"name": place["name"], "lat": location["lat"], "lng": location["lng"]}
+        )
+    return places
+
+
+@st.cache_data(ttl=STREET_VIEW_CACHE_TTL, show_spinner=False)
+def lookup_street_views(location):
+    """
+    Geocode a location and find nearby famous places. Cached, so page
+    reruns (e.g. while a story job is polled) do not call the Maps APIs
+    again. Only answers are cached: request errors and failure statuses
+    raise, so they are retried on the next run.
+    """
+    # Get coordinates using Google Geocoding API
+    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+    params = {"address": location, "key": os.getenv("GOOGLE_MAPS_API_KEY")}
+    data = maps_api_get(base_url, params)
+
+    if data["status"] != "OK":
+        # ZERO_RESULTS: the location is unknown to Google Maps
         return []
 
+    # Get main location
+    main_location = data["results"][0]["geometry"]["location"]
+    urls = []
+
+    # Add main location
+    main_url = f"https://www.google.com/maps/embed/v1/streetview?key={os.getenv('GOOGLE_MAPS_API_KEY')}&location={main_location['lat']},{main_location['lng']}"
+    urls.append({"url": main_url, "title": "Main Location"})
+
+    # Get nearby famous places
+    nearby_places = get_nearby_places(main_location["lat"], main_location["lng"])
+    for place in nearby_places:
+        url = f"https://www.google.com/maps/embed/v1/streetview?key={os.getenv('GOOGLE_MAPS_API_KEY')}&location={place['lat']},{place['lng']}"
+        urls.append({"url": url, "title": place["name"]})
+    return urls
+
 
 def get_street_view_urls(location):
     """Get street view URLs for a location and nearby famous places."""
     try:
         # Set loading state
         st.session_state.map_loading = True
-
-        # Get coordinates using Google Geocoding API
-        base_url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {"address": location, "key": os.getenv("GOOGLE_MAPS_API_KEY")}
-        response = requests.get(base_url, params=params)
-        data = response.json()
-
-        if data["status"] != "OK":
-            st.session_state.map_loading = False
-            return []
-
-        # Get main location
-        main_location = data["results"][0]["geometry"]["location"]
-        urls = []
-
-        # Add main location
-        main_url = f"https://www.google.com/maps/embed/v1/streetview?key={os.getenv('GOOGLE_MAPS_API_KEY')}&location={main_location['lat']},{main_location['lng']}"
-        urls.append({"url": main_url, "title": "Main Location"})
-
-        # Get nearby famous places
-        nearby_places = get_nearby_places(main_location["lat"], main_location["lng"])
-        for place in nearby_places:
-            url = f"https://www.google.com/maps/embed/v1/streetview?key={os.getenv('GOOGLE_MAPS_API_KEY')}&location={place['lat']},{place['lng']}"
-            urls.append({"url": url, "title": place["name"]})
-
+        return lookup_street_views(location)
+    except Exception as e:
+        print(f"Street View lookup failed for {location}: {e}")
+        return []
+    finally:
         # Clear loading state
         st.session_state.map_loading = False
-        return urls
-    except Exception:
-        st.session_state.map_loading = False
-        return []
 
 
 def render_street_view(location):
@@ -1,5 +1,10 @@
 import streamlit as st
-from utils.session import navigate_to_home, back_to_category, navigate_to_category
+from utils.session import (
+    navigate_to_home,
+    back_to_category,
+    navigate_to_category,
+    get_selected_item,
+)
 
 
 def render_back_to_categories_button():
@@ -108,11 +113,8 @@ def render_breadcrumb_navigation():
             breadcrumbs = ["🏠 Home", f"📂 {format_category_name(category_id)}"]
     elif st.session_state.view == "item_detail":
         category_id = st.session_state.selected_category
-        item_title = (
-            st.session_state.selected_item.get("title", "Item")
-            if st.session_state.selected_item
-            else "Item"
-        )
+        selected_item = get_selected_item()
+        item_title = selected_item.get("title", "Item") if selected_item else "Item"
         if category_id:
             breadcrumbs = [
                 "🏠 Home",
@@ -357,11 +359,8 @@ def render_enhanced_navigation_bar(app_data):
         if current_view == "category_detail" and selected_category:
             nav_title = f"📂 {format_category_name(selected_category)}"
         elif current_view == "item_detail":
-            item_title = (
-                st.session_state.selected_item.get("title", "Item")
-                if st.session_state.selected_item
-                else "Item"
-            )
+            selected_item = get_selected_item()
+            item_title = selected_item.get("title", "Item") if selected_item else "Item"
             nav_title = f"📄 {item_title[:30]}{'...' if len(item_title) > 30 else ''}"
 
         st.markdown(
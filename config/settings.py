@@ -30,3 +30,143 @@ INITIAL_CATEGORIES = {
 }
 
 DATA_ROOT = "data"
+
+# Snowflake connection pool
+SNOWFLAKE_POOL_SIZE = 4
+SNOWFLAKE_POOL_IDLE_TIMEOUT = 600  # seconds before an idle connection is closed
+SNOWFLAKE_POOL_HEALTH_CHECK_INTERVAL = 60  # ping idle connections older than this
+SNOWFLAKE_POOL_CHECKOUT_TIMEOUT = 30  # seconds to wait for a free connection
+
+# Load catalog categories concurrently, one pooled connection per category
+PARALLEL_CATEGORY_LOADING = True
+
+# Incremental catalog refresh (seconds; set CATALOG_REFRESH_INTERVAL to 0 to disable)
+CATALOG_REFRESH_INTERVAL = 300
+CATALOG_FULL_RELOAD_INTERVAL = 24 * 60 * 60
+# Columns tried, in order, as the per-table high-water mark for delta refreshes.
+# last_modified moves on every edit; tables without it fall back to
+# generated_at, which is set on insert, so they only pick up new rows
+# (edits to existing rows wait for the full reload).
+CATALOG_WATERMARK_COLUMNS = ["last_modified", "generated_at"]
+
+# Listing projection: catalog rows carry only the fields cards need and the
+# full row is fetched (and cached per item) when the item detail page opens
+CATALOG_LISTING_PROJECTION = True
+CARD_COLUMNS = ["ID", "TITLE", "IMAGES", "GENERATED_AT", "LAST_MODIFIED"]
+CARD_PREVIEW_COLUMNS = ["DESCRIPTION", "OVERVIEW", "SUMMARY"]
+CARD_PREVIEW_LENGTH = 200
+ITEM_DETAIL_CACHE_SIZE = 512
+
+# Seconds the introspected schema (category -> table mapping, table columns) is reused
+TABLE_RESOLUTION_TTL = 600
+
+# On-disk catalog snapshot served on cold start (set the path to None to disable)
+CATALOG_SNAPSHOT_PATH = ".cache/catalog_snapshot.pkl.gz"
+CATALOG_SNAPSHOT_SCHEMA_VERSION = 5
+
+# Outbound request politeness: (requests per second, burst) per host
+HOST_RATE_LIMITS = {
+    "www.google.com": (1.0, 2),
+    "en.wikipedia.org": (5.0, 5),
+}
+DEFAULT_HOST_RATE_LIMIT = (2.0, 4)
+
+# Story evidence gathering
+STORY_EVIDENCE_WORKERS = 8
+STORY_EVIDENCE_DEADLINE = 10  # seconds; generation proceeds with whatever has returned
+
+# Persistent story cache
+STORY_CACHE_PATH = ".cache/stories.sqlite3"
+STORY_CACHE_TTL = 30 * 24 * 60 * 60  # seconds
+STORY_CACHE_MAX_ENTRIES = 5000
+STORY_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Story pre-generation (python -m utils.story_batch)
+STORY_BATCH_WORKERS = 4
+STORY_BATCH_CHECKPOINT_PATH = ".cache/story_batch_checkpoint.json"
+
+# Shared outbound HTTP client
+HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+HTTP_MAX_RETRIES = 2
+HTTP_BACKOFF_BASE = 0.5  # seconds, doubled per retry before jitter
+HTTP_BACKOFF_MAX = 5
+HTTP_RETRY_STATUSES = [429, 500, 502, 503, 504]
+HTTP_POOL_CONNECTIONS = 10  # hosts kept in the pool
+HTTP_POOL_MAXSIZE = 10  # keep-alive connections per host
+
+# Story grounding: "local" builds the prompt from the item's own fields
+# (summary, key points, timeline, ...) with no network calls; "web" scrapes
+# Wikipedia, Google Search and Google News for every story
+STORY_GROUNDING = "local"
+
+# Story prompt context budgeting
+STORY_CONTEXT_TOKEN_BUDGET = 1500  # tokens of external evidence per prompt
+STORY_CONTEXT_CHARS_PER_TOKEN = 4
+STORY_CONTEXT_SHINGLE_SIZE = 5  # words per shingle
+STORY_CONTEXT_DUPLICATE_THRESHOLD = 0.6  # Jaccard similarity treated as a duplicate
+
+# Model admission control shared by all sessions
+LLM_MAX_CONCURRENCY = 4
+LLM_MIN_CONCURRENCY = 1
+LLM_MAX_QUEUE = 16  # waiting requests beyond this are rejected immediately
+LLM_BACKOFF_FACTOR = 0.5  # limit multiplier after a provider rate-limit error
+
+# Background story worker
+STORY_JOB_DB_PATH = ".cache/story_jobs.sqlite3"
+STORY_JOB_WORKERS = 4
+STORY_JOB_POLL_INTERVAL = 1.0  # seconds between page refreshes while a story is pending
+STORY_JOB_PARTIAL_FLUSH_INTERVAL = 0.5  # seconds between partial text writes
+STORY_JOB_RETENTION = 24 * 60 * 60  # finished jobs are pruned after this many seconds
+
+# Google Maps lookups for the Street View section
+STREET_VIEW_CACHE_TTL = 24 * 60 * 60  # seconds a geocoded location is reused
+
+# Responsive image derivatives, served by Streamlit's static file serving
+# (enableStaticServing in .streamlit/config.toml exposes static/ at app/static/)
+STATIC_ROOT = "static"
+STATIC_URL_PREFIX = "app/static"
+IMAGE_DERIVATIVE_DIR = "static/derivatives"
+IMAGE_DERIVATIVE_WIDTHS = [320, 640, 960, 1280]
+IMAGE_DERIVATIVE_FORMATS = ["webp", "jpeg"]
+IMAGE_DERIVATIVE_QUALITY = 80
+CATEGORY_CARD_IMAGES = {
+    "sculptures_architecture": "data/Categories/SculpturesAndArchitecture.png",
+    "handicrafts_paintings": "data/Categories/HandicraftsAndPaintings.jpg",
+    "performing_arts_festivals": "data/Categories/PerformingArtsAndFestivals.jpg",
+    "artists": "data/Categories/IndianArtist.png",
+}
+
+# Local proxy/cache for remote item images (Wikimedia)
+IMAGE_PROXY_ROOT = ".cache/images"  # content-addressed originals + index
+IMAGE_PROXY_VARIANT_DIR = "static/proxy"  # resized copies served at app/static/proxy/
+IMAGE_PROXY_MAX_BYTES = 500 * 1024 * 1024  # originals beyond this are evicted LRU
+IMAGE_PROXY_MAX_IMAGE_BYTES = 25 * 1024 * 1024  # larger downloads are not cached
+IMAGE_PROXY_REVALIDATE_AFTER = 7 * 24 * 60 * 60  # seconds before a conditional GET
+IMAGE_PROXY_WORKERS = 4
+IMAGE_PROXY_TOUCH_AFTER = 60 * 60  # seconds before a read refreshes an entry's LRU time
+IMAGE_PROXY_USER_AGENT = "ArtCultureExplorer/1.0 (image cache)"
+
+# Display widths of item images. Renderers request the Wikimedia Commons
+# thumbnail at the smallest of these widths (Commons' standard thumbnail
+# steps) that is wide enough, derived from the original URL when rendering.
+IMAGE_CARD_WIDTH = 500
+IMAGE_SLIDER_WIDTH = 1280
+IMAGE_FULLSCREEN_WIDTH = 1920
+IMAGE_THUMBNAIL_WIDTHS = [IMAGE_CARD_WIDTH, IMAGE_SLIDER_WIDTH, IMAGE_FULLSCREEN_WIDTH]
+
+# Image dimensions and blurred placeholders (python -m utils.image_placeholders)
+IMAGE_PLACEHOLDER_PATH = "data/image_placeholders.json"  # sidecar keyed by image URL
+IMAGE_PLACEHOLDER_SIZE = 16  # longest side of the placeholder, in pixels
+IMAGE_PLACEHOLDER_BLUR = 1  # Gaussian blur radius at placeholder size
+IMAGE_PLACEHOLDER_QUALITY = 50
+IMAGE_PLACEHOLDER_WORKERS = 4
+
+# Dead image link validation (python -m utils.image_links)
+IMAGE_LINK_DB_PATH = ".cache/image_links.sqlite3"
+IMAGE_LINK_CONCURRENCY = 16  # HEAD requests in flight overall
+IMAGE_LINK_PER_HOST = 4  # HEAD requests in flight per host
+# The validator has its own per-host limiter (requests per second, burst), so
+# the app-wide HOST_RATE_LIMITS do not cap it at DEFAULT_HOST_RATE_LIMIT
+IMAGE_LINK_RATE_LIMIT = (10.0, IMAGE_LINK_PER_HOST)
+IMAGE_LINK_RECHECK_AFTER = 7 * 24 * 60 * 60  # seconds before a URL is checked again
+IMAGE_LINK_ERROR_RECHECK_AFTER = 60 * 60  # same, for checks that failed transiently
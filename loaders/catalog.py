@@ -0,0 +1,319 @@
+import hashlib
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from config.settings import CATALOG_WATERMARK_COLUMNS
+from loaders.snapshot import read_snapshot, write_snapshot
+from utils.router import StreamlitRouter
+
+
+def item_key(item):
+    """Stable key used to match refreshed rows with catalog items"""
+    return str(item.get("id") or item.get("title"))
+
+
+def compute_watermark(items):
+    """
+    Return (column, max value) for the first watermark column populated in
+    items, or (None, None) if none of them is. last_modified is preferred
+    so edits are picked up; a generated_at watermark only sees inserts.
+    """
+    for column in CATALOG_WATERMARK_COLUMNS:
+        values = [item.get(column) for item in items if item.get(column) is not None]
+        if not values:
+            continue
+        try:
+            return column.upper(), max(values)
+        except TypeError:
+            # Mixed value types can't be ordered; try the next column
+            continue
+    return None, None
+
+
+def item_fingerprint(item):
+    """Short hash of an item's identifying fields, stable across reloads"""
+    fields = [
+        str(item.get(name) or "")
+        for name in ("id", "title", "source_url", "generated_at", "summary")
+    ]
+    return hashlib.sha1("\x1f".join(fields).encode("utf-8")).hexdigest()[:6]
+
+
+def assign_item_ids(items):
+    """
+    Return the items with an "item_id" added to those whose URL id is shared
+    with another item of the same list. The suffix is a fingerprint of the
+    item rather than its position, so ids survive reordering and refreshes.
+    """
+    groups = {}
+    for item in items:
+        base_id = StreamlitRouter.generate_item_id(item, disambiguate=False)
+        groups.setdefault(base_id, []).append(item)
+
+    assigned = []
+    taken = set(groups)
+    for item in items:
+        base_id = StreamlitRouter.generate_item_id(item, disambiguate=False)
+        if len(groups[base_id]) == 1:
+            if "item_id" in item:
+                # Its duplicate is gone; the plain id is unique again
+                item = {key: value for key, value in item.items() if key != "item_id"}
+            assigned.append(item)
+            continue
+        item_id = f"{base_id}_{item_fingerprint(item)}"
+        # Identical duplicates share a fingerprint; number them
+        suffix = 2
+        unique_id = item_id
+        while unique_id in taken:
+            unique_id = f"{item_id}_{suffix}"
+            suffix += 1
+        taken.add(unique_id)
+        assigned.append({**item, "item_id": unique_id})
+    return assigned
+
+
+def merge_items(items, changed_items):
+    """Return a new item list with changed items replaced in place or appended"""
+    merged = list(items)
+    positions = {item_key(item): index for index, item in enumerate(merged)}
+
+    for item in changed_items:
+        key = item_key(item)
+        if key in positions:
+            merged[positions[key]] = item
+        else:
+            positions[key] = len(merged)
+            merged.append(item)
+
+    return merged
+
+
+def freeze_item(item):
+    """Return a read-only view of an item dict"""
+    if isinstance(item, MappingProxyType):
+        return item
+    return MappingProxyType(dict(item))
+
+
+class Catalog(Mapping):
+    """
+    Immutable application data shared by every session.
+
+    Behaves like the app_data dict pages already use (category id ->
+    category info with an "items" sequence), but categories and items are
+    read-only views and items are stored as tuples, so one instance can be
+    handed to every rerun without copying. A (category_id, item_id) index
+    is built once so deep links resolve with a dict lookup; items whose
+    title would give the same id as another item in their category get a
+    suffixed "item_id" so each one is reachable.
+    """
+
+    def __init__(self, app_data):
+        self._categories = {}
+        self._item_index = {}
+        self.slug_collisions = []
+        for category_id, category_info in app_data.items():
+            items = assign_item_ids(category_info.get("items", []))
+            self._categories[category_id] = MappingProxyType(
+                {**category_info, "items": tuple(freeze_item(item) for item in items)}
+            )
+        self._build_item_index()
+
+    def _build_item_index(self):
+        for category_id, category_info in self._categories.items():
+            for item in category_info["items"]:
+                item_id = StreamlitRouter.generate_item_id(item)
+                self._item_index[(category_id, item_id)] = item
+                base_id = StreamlitRouter.generate_item_id(item, disambiguate=False)
+                if base_id != item_id:
+                    # Links from before disambiguation keep resolving to
+                    # the first of the items sharing the id
+                    self._item_index.setdefault((category_id, base_id), item)
+                    self.slug_collisions.append((category_id, base_id))
+
+        if self.slug_collisions:
+            collided = sorted(set(self.slug_collisions))
+            print(
+                f"Catalog has {len(collided)} item ids shared by several items; "
+                f"they were given suffixed ids: {collided[:10]}"
+            )
+
+    def find_item(self, category_id, item_id):
+        """Return the item with the given URL id in a category, or None"""
+        return self._item_index.get((category_id, item_id))
+
+    def __getitem__(self, category_id):
+        return self._categories[category_id]
+
+    def __iter__(self):
+        return iter(self._categories)
+
+    def __len__(self):
+        return len(self._categories)
+
+
+class CatalogStore:
+    """
+    Shared in-memory catalog refreshed incrementally.
+
+    The first call to get() performs a full load. Afterwards get() always
+    returns the current immutable Catalog immediately (no per-rerun copy);
+    when refresh_interval (seconds, 0 disables refreshing) has
+    elapsed a background thread fetches rows newer than each table's
+    high-water mark and swaps in a new catalog once they are merged. A full
+    reload replaces the catalog every full_reload_interval seconds so that
+    deleted rows eventually disappear.
+
+    When snapshot_path is set, every successful load is also written to an
+    on-disk snapshot. A fresh process serves that snapshot immediately and
+    revalidates it against the warehouse in the background, so startup does
+    not wait on Snowflake and the site stays browsable if it is unreachable.
+    """
+
+    def __init__(
+        self,
+        full_loader,
+        delta_loader,
+        refresh_interval,
+        full_reload_interval,
+        snapshot_path=None,
+        snapshot_version=None,
+        snapshot_source=None,
+    ):
+        self.full_loader = full_loader
+        self.delta_loader = delta_loader
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.snapshot_path = snapshot_path
+        self.snapshot_version = snapshot_version
+        self.snapshot_source = snapshot_source
+
+        self._data = None
+        self._tables = {}
+        self._watermarks = {}
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._load_lock = threading.Lock()
+        self._refreshing = threading.Event()
+
+    def get(self):
+        """Return the current catalog, scheduling a background refresh if due"""
+        if self._data is None:
+            self._initial_load()
+        else:
+            self.maybe_refresh()
+        return self._data
+
+    def _initial_load(self):
+        # Only one session performs the cold load; the others wait for it
+        with self._load_lock:
+            if self._data is not None:
+                return
+            if self._load_snapshot():
+                # Serve the snapshot now and revalidate it in the background
+                self._start_refresh()
+            else:
+                self._full_load()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path:
+            return False
+
+        payload = read_snapshot(
+            self.snapshot_path, self.snapshot_version, self.snapshot_source
+        )
+        if payload is None:
+            return False
+
+        self._tables = payload["tables"]
+        self._watermarks = payload["watermarks"]
+        self._data = Catalog(payload["app_data"])
+
+        # Age the snapshot so a stale one triggers a full reload, not a delta
+        age = max(0.0, time.time() - payload["written_at"])
+        self._last_full_load = time.monotonic() - age
+        return True
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        try:
+            write_snapshot(
+                self.snapshot_path,
+                self._data,
+                self._tables,
+                self._watermarks,
+                self.snapshot_version,
+                self.snapshot_source,
+            )
+        except Exception as e:
+            print(f"Failed to write catalog snapshot: {e}")
+
+    def _full_load(self):
+        result = self.full_loader()
+        if result is None:
+            return False
+
+        app_data, tables = result
+        self._set_catalog(app_data, tables)
+        self._last_full_load = self._last_refresh = time.monotonic()
+        self._save_snapshot()
+        return True
+
+    def _set_catalog(self, app_data, tables):
+        watermarks = {
+            category_id: compute_watermark(app_data[category_id].get("items", []))
+            for category_id in tables
+        }
+        catalog = Catalog(app_data)
+        # Publish the new catalog with a single reference swap
+        self._tables, self._watermarks = tables, watermarks
+        self._data = catalog
+
+    def maybe_refresh(self):
+        """Start a background refresh if the refresh interval has elapsed"""
+        if self.refresh_interval <= 0:
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        self._start_refresh()
+
+    def _start_refresh(self):
+        if self._refreshing.is_set():
+            return
+
+        self._refreshing.set()
+        threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _refresh(self):
+        try:
+            if time.monotonic() - self._last_full_load >= self.full_reload_interval:
+                self._full_load()
+            else:
+                self._delta_refresh()
+        except Exception as e:
+            print(f"Catalog refresh failed: {e}")
+        finally:
+            self._last_refresh = time.monotonic()
+            self._refreshing.clear()
+
+    def _delta_refresh(self):
+        changes = self.delta_loader(self._tables, self._watermarks)
+        if not changes or not any(changes.values()):
+            return
+
+        # Copy-on-write: readers keep using the old catalog until the swap
+        app_data = dict(self._data)
+        for category_id, changed_items in changes.items():
+            if not changed_items:
+                continue
+            category_info = app_data[category_id]
+            app_data[category_id] = {
+                **category_info,
+                "items": merge_items(category_info.get("items", []), changed_items),
+            }
+
+        self._set_catalog(app_data, self._tables)
+        self._save_snapshot()
@@ -0,0 +1,172 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class SnowflakeConnectionPool:
+    """
+    Thread-safe pool of long-lived Snowflake connections.
+
+    Connections are created lazily through ``connection_factory`` (which must
+    return a connection or None), checked for health on checkout, evicted
+    after sitting idle for ``idle_timeout`` seconds and transparently
+    replaced when they turn out to be closed or broken.
+    """
+
+    def __init__(
+        self,
+        connection_factory,
+        max_size=4,
+        idle_timeout=600,
+        health_check_interval=60,
+        checkout_timeout=30,
+    ):
+        self.connection_factory = connection_factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        # Idle connections as (connection, last_used_timestamp), most recent last
+        self._idle = []
+        self._in_use = 0
+        self._stats = {"created": 0, "reused": 0, "evicted": 0, "reconnects": 0}
+
+    def _close_quietly(self, conn):
+        """Close a connection, ignoring any error raised while closing."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used):
+        """Check that an idle connection is still usable."""
+        try:
+            if conn.is_closed():
+                return False
+            # Only ping connections that have been idle for a while
+            if time.monotonic() - last_used < self.health_check_interval:
+                return True
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def evict_idle(self):
+        """Close connections that have been idle longer than idle_timeout."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                conn for conn, last_used in self._idle
+                if now - last_used >= self.idle_timeout
+            ]
+            self._idle = [
+                (conn, last_used) for conn, last_used in self._idle
+                if now - last_used < self.idle_timeout
+            ]
+            self._stats["evicted"] += len(expired)
+
+        for conn in expired:
+            self._close_quietly(conn)
+
+    def acquire(self):
+        """Check out a healthy connection, creating one if needed."""
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PoolExhaustedError(
+                f"No Snowflake connection available after {self.checkout_timeout}s"
+            )
+
+        try:
+            self.evict_idle()
+
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    conn, last_used = self._idle.pop()
+
+                if self._is_healthy(conn, last_used):
+                    with self._lock:
+                        self._in_use += 1
+                        self._stats["reused"] += 1
+                    return conn
+
+                # Broken connection: drop it and try the next idle one
+                self._close_quietly(conn)
+                with self._lock:
+                    self._stats["reconnects"] += 1
+
+            conn = self.connection_factory()
+            if conn is None:
+                self._slots.release()
+                return None
+
+            with self._lock:
+                self._in_use += 1
+                self._stats["created"] += 1
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        """Return a connection to the pool, closing it if it is broken."""
+        with self._lock:
+            self._in_use -= 1
+
+        try:
+            broken = broken or conn.is_closed()
+        except Exception:
+            broken = True
+
+        if broken:
+            self._close_quietly(conn)
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection, or None if one cannot
+        be created or the pool stays exhausted past checkout_timeout.
+        Connections closed during use are not returned to the pool.
+        """
+        try:
+            conn = self.acquire()
+        except PoolExhaustedError as e:
+            print(f"Snowflake connection pool exhausted: {e}")
+            conn = None
+
+        if conn is None:
+            yield None
+            return
+
+        try:
+            yield conn
+        finally:
+            # release() discards the connection if it was closed during use
+            self.release(conn)
+
+    def stats(self):
+        """Return a snapshot of pool usage counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "max_size": self.max_size,
+            }
@@ -1,10 +1,37 @@
 import streamlit as st
 import snowflake.connector
+from snowflake.connector.errors import NotSupportedError, ProgrammingError
 import pandas as pd
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from config.settings import INITIAL_CATEGORIES
+from config.settings import (
+    INITIAL_CATEGORIES,
+    PARALLEL_CATEGORY_LOADING,
+    CATALOG_REFRESH_INTERVAL,
+    CATALOG_FULL_RELOAD_INTERVAL,
+    CATALOG_LISTING_PROJECTION,
+    CARD_COLUMNS,
+    CARD_PREVIEW_COLUMNS,
+    CARD_PREVIEW_LENGTH,
+    ITEM_DETAIL_CACHE_SIZE,
+    TABLE_RESOLUTION_TTL,
+    CATALOG_SNAPSHOT_PATH,
+    CATALOG_SNAPSHOT_SCHEMA_VERSION,
+    SNOWFLAKE_POOL_SIZE,
+    SNOWFLAKE_POOL_IDLE_TIMEOUT,
+    SNOWFLAKE_POOL_HEALTH_CHECK_INTERVAL,
+    SNOWFLAKE_POOL_CHECKOUT_TIMEOUT,
+)
+from loaders.catalog import CatalogStore
+from loaders.connection_pool import SnowflakeConnectionPool
+from loaders.table_resolver import TableResolver
+from loaders.item_processing import (
+    JSON_FIELDS,
+    safe_json_parse,
+    process_item_data,
+    process_columns,
+)
 
 # Load environment variables
 load_dotenv()
@@ -53,68 +80,56 @@ def create_snowflake_connection():
         return None
 
 
-def safe_json_parse(value):
-    """Safely parse JSON string, return original value if parsing fails"""
-    if not isinstance(value, str):
-        return value
+@st.cache_resource
+def get_connection_pool():
+    """Process-wide Snowflake connection pool shared by all sessions"""
+    return SnowflakeConnectionPool(
+        create_snowflake_connection,
+        max_size=int(os.getenv("SNOWFLAKE_POOL_SIZE", SNOWFLAKE_POOL_SIZE)),
+        idle_timeout=SNOWFLAKE_POOL_IDLE_TIMEOUT,
+        health_check_interval=SNOWFLAKE_POOL_HEALTH_CHECK_INTERVAL,
+        checkout_timeout=SNOWFLAKE_POOL_CHECKOUT_TIMEOUT,
+    )
 
-    if not value or value.strip() == "":
-        return None
 
-    # Try to parse as JSON
-    try:
-        # Handle common JSON formats
-        value = value.strip()
-        if value.startswith("{") and value.endswith("}"):
-            return json.loads(value)
-        elif value.startswith("[") and value.endswith("]"):
-            return json.loads(value)
-        else:
-            # Try to parse anyway in case it's a JSON string without obvious delimiters
-            return json.loads(value)
-    except (json.JSONDecodeError, ValueError):
-        # If JSON parsing fails, return the original string
-        return value
-
-
-def process_item_data(raw_item):
-    """Process raw item data from Snowflake, handling JSON parsing"""
-    processed_item = {}
-
-    for key, value in raw_item.items():
-        key_lower = key.lower()
-
-        # Handle special fields that should be parsed as JSON
-        if key_lower in [
-            "applications",
-            "categories",
-            "images",
-            "important_figures",
-            "key_points",
-            "references",
-            "related_topics",
-            "timeline",
-        ]:
-            processed_item[key_lower] = safe_json_parse(value) or []
-
-        # Handle other fields
-        elif key_lower == "title":
-            processed_item["title"] = value or "Untitled Item"
-        elif key_lower == "summary":
-            processed_item["summary"] = value or ""
-        elif key_lower == "current_status":
-            processed_item["current_status"] = value or ""
-        elif key_lower == "future_prospects":
-            processed_item["future_prospects"] = value or ""
-        elif key_lower == "source_url":
-            processed_item["source_url"] = value or ""
-        elif key_lower in ["generated_at", "last_modified"]:
-            processed_item[key_lower] = value
-        else:
-            # For any other fields, try to parse as JSON, otherwise keep as is
-            processed_item[key_lower] = safe_json_parse(value)
+@st.cache_resource
+def get_table_resolver():
+    """Process-wide category -> table mapping shared by all loaders"""
+    return TableResolver(ttl=TABLE_RESOLUTION_TTL)
+
+
+def pooled_connection():
+    """
+    Check out a connection from the shared pool (use as a context manager).
+    Yields None if no connection can be created or the pool stays exhausted
+    past SNOWFLAKE_POOL_CHECKOUT_TIMEOUT, so callers keep their `if not conn`
+    fallback.
+    """
+    return get_connection_pool().connection()
 
-    return processed_item
+
+def fetch_columns(cursor):
+    """
+    Fetch the current result set column-wise as (column_names, columns).
+    Uses Arrow result batches when the connector supports them and falls
+    back to transposing fetchall() rows otherwise.
+    """
+    column_names = [desc[0] for desc in cursor.description]
+
+    try:
+        columns = [[] for _ in column_names]
+        # The batch iterator is lazy, so the Arrow check can also fail while iterating
+        for batch in cursor.fetch_arrow_batches():
+            for values, column in zip(columns, batch.columns):
+                values.extend(column.to_pylist())
+        return column_names, columns
+    except (NotSupportedError, ProgrammingError):
+        # Result set is not in Arrow format, or pyarrow is not installed
+        # (the connector raises ProgrammingError for the latter)
+        rows = cursor.fetchall()
+        if not rows:
+            return column_names, [[] for _ in column_names]
+        return column_names, [list(column) for column in zip(*rows)]
 
 
 @st.cache_data
@@ -124,74 +139,264 @@ def load_all_data_streamlit():
     into a dictionary structure for the Streamlit application.
     Returns the full item data (cached).
     """
-    # Create fresh connection for this operation
-    conn = create_snowflake_connection()
-    if not conn:
+    result = load_catalog_full()
+    if result is None:
         return None
 
-    app_data = {}
-    app_data.update(INITIAL_CATEGORIES)
+    app_data, _ = result
+    return app_data
 
-    try:
-        cursor = conn.cursor()
 
-        # Get available tables
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
-        available_tables = [
-            table[1] for table in tables
-        ]  # Table name is usually in index 1
+def load_catalog_full():
+    """
+    Uncached full load of every category.
+    Returns (app_data, category_tables) where category_tables maps each
+    category id to the table it was loaded from, or None on failure.
+    If any category fails to load the whole load fails, so a transient
+    error never publishes (or snapshots) the category as empty.
+    """
+    with pooled_connection() as conn:
+        if not conn:
+            return None
 
-        # Iterate through each category
-        for category_id in INITIAL_CATEGORIES.keys():
-            try:
-                # Try different table naming conventions, including ARTISTS
-                possible_table_names = [
-                    f"{category_id}_items",
-                    f"{category_id.upper()}_ITEMS",
-                    f"items_{category_id}",
-                    f"ITEMS_{category_id.upper()}",
-                    category_id,
-                    category_id.upper(),
-                    "ARTISTS",  # Add ARTISTS table specifically
-                ]
-
-                table_found = False
-                for table_name in possible_table_names:
-                    if table_name in available_tables:
-                        # Load data from the table
-                        query = f"SELECT * FROM {table_name}"
-                        cursor.execute(query)
-                        results = cursor.fetchall()
-
-                        # Get column names
-                        column_names = [desc[0] for desc in cursor.description]
+        try:
+            cursor = conn.cursor()
 
-                        # Convert results to list of dictionaries with proper JSON parsing
-                        for row in results:
-                            raw_item = dict(zip(column_names, row))
+            # Introspect the schema once (cached) before any category is loaded
+            get_table_resolver().ensure_fresh(cursor)
 
-                            # Process the item data with proper JSON parsing
-                            processed_item = process_item_data(raw_item)
+            if not PARALLEL_CATEGORY_LOADING:
+                category_results = {
+                    category_id: _fetch_category_items(cursor, category_id)
+                    for category_id in INITIAL_CATEGORIES.keys()
+                }
 
-                            app_data[category_id]["items"].append(processed_item)
+        except Exception as e:
+            st.error(f"Database query error: {e}")
+            return None
+
+    if PARALLEL_CATEGORY_LOADING:
+        category_results = _load_categories_parallel()
+
+    failed = [
+        category_id
+        for category_id in INITIAL_CATEGORIES.keys()
+        if category_results.get(category_id) is None
+    ]
+    if failed:
+        print(f"Catalog load failed for categories: {failed}")
+        return None
+
+    # Copy the category definitions so loads never mutate INITIAL_CATEGORIES
+    app_data = {
+        category_id: {**category_info, "items": []}
+        for category_id, category_info in INITIAL_CATEGORIES.items()
+    }
+    category_tables = {}
+
+    # Merge in category order so the result matches the sequential loader
+    for category_id in INITIAL_CATEGORIES.keys():
+        table_name, items = category_results[category_id]
+        app_data[category_id]["items"].extend(items)
+        if table_name:
+            category_tables[category_id] = table_name
 
-                        table_found = True
-                        break
+    return app_data, category_tables
 
+
+def load_catalog_delta(category_tables, watermarks):
+    """
+    Fetch only the rows changed since each category's high-water mark.
+    watermarks maps category id -> (column name, last seen value).
+    Returns {category_id: changed items}, or None if no connection is available.
+    """
+    changes = {}
+    with pooled_connection() as conn:
+        if not conn:
+            return None
+
+        cursor = conn.cursor()
+        for category_id, table_name in category_tables.items():
+            column, since = watermarks.get(category_id, (None, None))
+            if column is None or since is None:
+                continue
+
+            try:
+                changes[category_id] = _fetch_table_items(
+                    cursor, table_name, column, since
+                )
             except Exception as e:
                 continue
 
+    return changes
+
+
+def _card_projection(cursor, table_name):
+    """
+    Build the select list for listing rows: card columns as-is, preview
+    columns truncated to CARD_PREVIEW_LENGTH characters.
+    """
+    available = {
+        name.upper(): name
+        for name in get_table_resolver().columns_for(cursor, table_name)
+    }
+
+    select_list = [f'"{available[name]}"' for name in CARD_COLUMNS if name in available]
+    select_list += [
+        f'LEFT("{available[name]}", {CARD_PREVIEW_LENGTH}) AS "{available[name]}"'
+        for name in CARD_PREVIEW_COLUMNS
+        if name in available
+    ]
+    return ", ".join(select_list) or "*"
+
+
+def _fetch_table_items(cursor, table_name, watermark_column=None, since=None):
+    """
+    Load and process the rows of a table, optionally only those newer than
+    since. With the listing projection enabled only card fields are fetched.
+    """
+    columns = "*"
+    if CATALOG_LISTING_PROJECTION:
+        columns = _card_projection(cursor, table_name)
+
+    query = f"SELECT {columns} FROM {table_name}"
+    if watermark_column and since is not None:
+        cursor.execute(f"{query} WHERE {watermark_column} > %s", (since,))
+    else:
+        cursor.execute(query)
+
+    # Process the result column by column with proper JSON parsing
+    return process_columns(*fetch_columns(cursor))
+
+
+def _fetch_category_items(cursor, category_id):
+    """
+    Fetch and process every item of one category.
+    Returns (table_name, items), (None, []) if the category has no table,
+    or None if loading it failed.
+    """
+    try:
+        table_name = get_table_resolver().table_for(cursor, category_id)
+        if table_name:
+            return table_name, _fetch_table_items(cursor, table_name)
+        return None, []
+
     except Exception as e:
-        st.error(f"Database query error: {e}")
+        print(f"Could not load category {category_id}: {e}")
+        # The cached schema may be out of date; re-introspect next time
+        get_table_resolver().invalidate()
         return None
 
-    finally:
-        # Always close the connection
-        if conn:
-            conn.close()
 
-    return app_data
+def _load_category_worker(category_id):
+    """Load one category on its own pooled connection (runs in a worker thread)"""
+    with pooled_connection() as conn:
+        if not conn:
+            print(f"Could not load category {category_id}: no connection available")
+            return None
+        return _fetch_category_items(conn.cursor(), category_id)
+
+
+def _load_categories_parallel():
+    """
+    Load all categories concurrently, one pooled connection per category,
+    so total latency is bounded by the slowest table rather than their sum.
+    """
+    category_ids = list(INITIAL_CATEGORIES.keys())
+    max_workers = max(1, min(len(category_ids), get_connection_pool().max_size))
+
+    category_results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_load_category_worker, category_id): category_id
+            for category_id in category_ids
+        }
+        for future in as_completed(futures):
+            category_id = futures[future]
+            try:
+                category_results[category_id] = future.result()
+            except Exception as e:
+                print(f"Could not load category {category_id}: {e}")
+                category_results[category_id] = None
+
+    return category_results
+
+
+@st.cache_data(max_entries=ITEM_DETAIL_CACHE_SIZE, ttl=CATALOG_REFRESH_INTERVAL or None)
+def load_item_detail(category_id, key_column, key_value):
+    """
+    Loads the full row of a single item, looked up by key_column.
+    Cached per item so repeat visits don't hit Snowflake; entries expire
+    with the catalog refresh so details never lag behind their cards.
+    """
+    with pooled_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            cursor = conn.cursor()
+
+            table_name = get_table_resolver().table_for(cursor, category_id)
+            if not table_name:
+                return None
+
+            cursor.execute(
+                f'SELECT * FROM {table_name} WHERE "{key_column}" = %s LIMIT 1',
+                (key_value,),
+            )
+            items = process_columns(*fetch_columns(cursor))
+            return items[0] if items else None
+
+        except Exception as e:
+            print(f"Could not load item {key_value} from {category_id}: {e}")
+            return None
+
+
+def load_full_item(category_id, item):
+    """
+    Return the full version of an item from the catalog. Listing rows only
+    carry card fields, so the complete row is fetched on demand.
+    """
+    if not CATALOG_LISTING_PROJECTION or not item or not category_id:
+        return item
+
+    if item.get("id"):
+        full_item = load_item_detail(category_id, "ID", item["id"])
+    else:
+        full_item = load_item_detail(category_id, "TITLE", item.get("title"))
+
+    return full_item or item
+
+
+@st.cache_resource
+def get_catalog_store():
+    """Process-wide catalog kept fresh by incremental (delta) refreshes"""
+    return CatalogStore(
+        load_catalog_full,
+        load_catalog_delta,
+        refresh_interval=CATALOG_REFRESH_INTERVAL,
+        full_reload_interval=CATALOG_FULL_RELOAD_INTERVAL,
+        snapshot_path=CATALOG_SNAPSHOT_PATH,
+        snapshot_version=(CATALOG_SNAPSHOT_SCHEMA_VERSION, CATALOG_LISTING_PROJECTION),
+        snapshot_source=_snapshot_source(),
+    )
+
+
+def _snapshot_source():
+    """Identify the warehouse data a snapshot was taken from"""
+    return "/".join(
+        os.getenv(name) or ""
+        for name in ("SNOWFLAKE_ACCOUNT", "SNOWFLAKE_DATABASE", "SNOWFLAKE_SCHEMA")
+    )
+
+
+def get_catalog():
+    """
+    Return the shared, immutable catalog for the current run. It is built
+    once per process and handed out by reference, so each rerun costs O(1);
+    with delta refresh enabled changed rows are picked up in the background.
+    """
+    return get_catalog_store().get()
 
 
 @st.cache_data
@@ -200,80 +405,47 @@ def load_category_data_streamlit(category_id):
     Loads data for a specific category from Snowflake.
     Useful for loading data on-demand instead of all at once.
     """
-    conn = create_snowflake_connection()
-    if not conn:
-        return []
+    with pooled_connection() as conn:
+        if not conn:
+            return []
+        return _load_category_data(conn, category_id)
+
 
+def _load_category_data(conn, category_id):
+    """Load a single category using an already checked-out connection"""
     try:
         cursor = conn.cursor()
 
-        # Try different table naming conventions, including ARTISTS
-        possible_table_names = [
-            f"{category_id}_items",
-            f"{category_id.upper()}_ITEMS",
-            f"items_{category_id}",
-            f"ITEMS_{category_id.upper()}",
-            category_id,
-            category_id.upper(),
-            "ARTISTS",  # Add ARTISTS table specifically
-        ]
-
-        # Get available tables
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
-        available_tables = [table[1] for table in tables]
-
-        # Find the correct table
-        table_name = None
-        for possible_name in possible_table_names:
-            if possible_name in available_tables:
-                table_name = possible_name
-                break
-
+        table_name = get_table_resolver().table_for(cursor, category_id)
         if not table_name:
             return []
 
         # Load data from the table
         query = f"SELECT * FROM {table_name}"
         cursor.execute(query)
-        results = cursor.fetchall()
-        column_names = [desc[0] for desc in cursor.description]
-
-        items = []
-        for row in results:
-            raw_item = dict(zip(column_names, row))
 
-            # Process the item data with proper JSON parsing
-            processed_item = process_item_data(raw_item)
-            items.append(processed_item)
-
-        return items
+        # Process the result column by column with proper JSON parsing
+        return process_columns(*fetch_columns(cursor))
 
     except Exception as e:
         return []
 
-    finally:
-        if conn:
-            conn.close()
-
 
 # Test function without caching
 def test_connection():
     """Test connection without caching (for debugging)"""
-    conn = create_snowflake_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT CURRENT_VERSION()")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            st.success(f"✅ Connection successful! Snowflake version: {version}")
-            return True
-        except Exception as e:
-            st.error(f"Query test failed: {e}")
-            return False
-        finally:
-            conn.close()
+    with pooled_connection() as conn:
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT CURRENT_VERSION()")
+                version = cursor.fetchone()[0]
+                cursor.close()
+                st.success(f"✅ Connection successful! Snowflake version: {version}")
+                return True
+            except Exception as e:
+                st.error(f"Query test failed: {e}")
+                return False
     return False
 
 
@@ -291,43 +463,27 @@ def load_data_with_pandas(category_id):
         # Create connection string for pandas
         conn_string = f"snowflake://{config['user']}:{config['password']}@{config['account']}/{config['database']}/{config['schema']}?warehouse={config['warehouse']}"
 
-        # Try different table names, including ARTISTS
-        possible_table_names = [
-            f"{category_id}_items",
-            f"{category_id.upper()}_ITEMS",
-            category_id,
-            category_id.upper(),
-            "ARTISTS",
-        ]
+        # Resolve the table through the shared schema cache instead of
+        # probing each naming convention with a failing query
+        with pooled_connection() as conn:
+            if not conn:
+                return pd.DataFrame()
+            table_name = get_table_resolver().table_for(conn.cursor(), category_id)
 
-        for table_name in possible_table_names:
-            try:
-                query = f"SELECT * FROM {table_name}"
-                df = pd.read_sql(query, conn_string)
-
-                # Process the dataframe to handle JSON columns
-                json_columns = [
-                    "applications",
-                    "categories",
-                    "images",
-                    "important_figures",
-                    "key_points",
-                    "references",
-                    "related_topics",
-                    "timeline",
-                ]
-
-                for col in json_columns:
-                    if col.upper() in df.columns:
-                        df[col.upper()] = df[col.upper()].apply(safe_json_parse)
-                    elif col in df.columns:
-                        df[col] = df[col].apply(safe_json_parse)
-
-                return df
-            except Exception:
-                continue
+        if not table_name:
+            return pd.DataFrame()
 
-        return pd.DataFrame()
+        query = f"SELECT * FROM {table_name}"
+        df = pd.read_sql(query, conn_string)
+
+        # Process the dataframe to handle JSON columns
+        for col in JSON_FIELDS:
+            if col.upper() in df.columns:
+                df[col.upper()] = df[col.upper()].apply(safe_json_parse)
+            elif col in df.columns:
+                df[col] = df[col].apply(safe_json_parse)
+
+        return df
 
     except Exception as e:
         return pd.DataFrame()
@@ -358,48 +514,70 @@ def show_debug_info():
     # Show available tables
     with st.expander("Available Tables"):
         if st.button("Show Tables"):
-            conn = create_snowflake_connection()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("SHOW TABLES")
-                    tables = cursor.fetchall()
-
-                    if tables:
-                        st.write("Available tables:")
-                        for table in tables:
-                            st.write(f"- {table[1]}")  # Table name
-                    else:
-                        st.warning("No tables found")
-
-                except Exception as e:
-                    st.error(f"Error showing tables: {e}")
-                finally:
-                    conn.close()
+            with pooled_connection() as conn:
+                if conn:
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("SHOW TABLES")
+                        tables = cursor.fetchall()
+
+                        if tables:
+                            st.write("Available tables:")
+                            for table in tables:
+                                st.write(f"- {table[1]}")  # Table name
+                        else:
+                            st.warning("No tables found")
+
+                    except Exception as e:
+                        st.error(f"Error showing tables: {e}")
 
     # Show sample data from ARTISTS table
     with st.expander("Sample Data from ARTISTS Table"):
         if st.button("Show Sample Data"):
-            conn = create_snowflake_connection()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT * FROM ARTISTS LIMIT 1")
-                    result = cursor.fetchone()
-                    column_names = [desc[0] for desc in cursor.description]
-
-                    if result:
-                        raw_item = dict(zip(column_names, result))
-                        st.write("Raw data:")
-                        st.json(raw_item)
-
-                        st.write("Processed data:")
-                        processed_item = process_item_data(raw_item)
-                        st.json(processed_item)
-                    else:
-                        st.warning("No data found in ARTISTS table")
-
-                except Exception as e:
-                    st.error(f"Error showing sample data: {e}")
-                finally:
-                    conn.close()
+            with pooled_connection() as conn:
+                if conn:
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("SELECT * FROM ARTISTS LIMIT 1")
+                        result = cursor.fetchone()
+                        column_names = [desc[0] for desc in cursor.description]
+
+                        if result:
+                            raw_item = dict(zip(column_names, result))
+                            st.write("Raw data:")
+                            st.json(raw_item)
+
+                            st.write("Processed data:")
+                            processed_item = process_item_data(raw_item)
+                            st.json(processed_item)
+                        else:
+                            st.warning("No data found in ARTISTS table")
+
+                    except Exception as e:
+                        st.error(f"Error showing sample data: {e}")
+
+    # Show connection pool usage
+    with st.expander("Connection Pool"):
+        st.json(get_connection_pool().stats())
+
+    # Show outbound HTTP usage per host
+    with st.expander("HTTP Client"):
+        from utils.http_client import http_client
+
+        st.json(http_client.metrics())
+
+    # Show how many duplicate story generations were coalesced
+    with st.expander("Story Requests"):
+        from utils.story_gen import story_flight
+        from utils.admission import llm_admission
+
+        st.json(story_flight.stats())
+        st.json(llm_admission.stats())
+
+    # Show per-session memory footprint
+    with st.expander("Session State Size"):
+        from utils.session import session_state_bytes
+
+        sizes = session_state_bytes()
+        st.write(f"Total: {sum(sizes.values()):,} bytes across {len(sizes)} keys")
+        st.json(dict(sorted(sizes.items(), key=lambda entry: entry[1], reverse=True)))
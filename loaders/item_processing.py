@@ -0,0 +1,105 @@
+import json
+
+from utils.image_placeholders import image_placeholders, load_placeholders
+
+# Fields stored as JSON arrays in Snowflake
+JSON_FIELDS = [
+    "applications",
+    "categories",
+    "images",
+    "important_figures",
+    "key_points",
+    "references",
+    "related_topics",
+    "timeline",
+]
+
+# Text fields that default to an empty string when missing
+TEXT_FIELDS = ["summary", "current_status", "future_prospects", "source_url"]
+
+
+def safe_json_parse(value):
+    """Safely parse JSON string, return original value if parsing fails"""
+    if not isinstance(value, str):
+        return value
+
+    if not value or value.strip() == "":
+        return None
+
+    # Try to parse as JSON
+    try:
+        # Handle common JSON formats
+        value = value.strip()
+        if value.startswith("{") and value.endswith("}"):
+            return json.loads(value)
+        elif value.startswith("[") and value.endswith("]"):
+            return json.loads(value)
+        else:
+            # Try to parse anyway in case it's a JSON string without obvious delimiters
+            return json.loads(value)
+    except (json.JSONDecodeError, ValueError):
+        # If JSON parsing fails, return the original string
+        return value
+
+
+def process_item_data(raw_item):
+    """Process raw item data from Snowflake, handling JSON parsing"""
+    processed_item = {}
+
+    for key, value in raw_item.items():
+        key_lower = key.lower()
+
+        # Handle special fields that should be parsed as JSON
+        if key_lower in JSON_FIELDS:
+            processed_item[key_lower] = safe_json_parse(value) or []
+
+        # Handle other fields
+        elif key_lower == "title":
+            processed_item["title"] = value or "Untitled Item"
+        elif key_lower in TEXT_FIELDS:
+            processed_item[key_lower] = value or ""
+        elif key_lower in ["generated_at", "last_modified"]:
+            processed_item[key_lower] = value
+        else:
+            # For any other fields, try to parse as JSON, otherwise keep as is
+            processed_item[key_lower] = safe_json_parse(value)
+
+    add_image_metadata(processed_item, load_placeholders())
+    return processed_item
+
+
+def process_column(key, values):
+    """Apply the process_item_data rules for one field to a whole column"""
+    if key in JSON_FIELDS:
+        return [safe_json_parse(value) or [] for value in values]
+    elif key == "title":
+        return [value or "Untitled Item" for value in values]
+    elif key in TEXT_FIELDS:
+        return [value or "" for value in values]
+    elif key in ["generated_at", "last_modified"]:
+        return list(values)
+    else:
+        return [safe_json_parse(value) for value in values]
+
+
+def process_columns(column_names, columns):
+    """
+    Columnar equivalent of process_item_data: process each column once
+    (lowercasing its name a single time and parsing JSON per column), then
+    assemble the item dicts at the end.
+    """
+    keys = [name.lower() for name in column_names]
+    processed = [process_column(key, values) for key, values in zip(keys, columns)]
+
+    items = [dict(zip(keys, row)) for row in zip(*processed)]
+    placeholders = load_placeholders()
+    for item in items:
+        add_image_metadata(item, placeholders)
+    return items
+
+
+def add_image_metadata(item, placeholders):
+    """Store the precomputed dimensions and placeholders of the item's images"""
+    # Without a sidecar there is nothing to attach (renderers look entries up lazily)
+    if placeholders and "images" in item:
+        item["image_placeholders"] = image_placeholders(item["images"], placeholders)
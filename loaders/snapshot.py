@@ -0,0 +1,58 @@
+import gzip
+import os
+import pickle
+import time
+
+from utils.storage import atomic_write
+
+
+def _to_plain(app_data):
+    """Convert a (possibly frozen) catalog into plain dicts and lists for pickling"""
+    return {
+        category_id: {
+            **category_info,
+            "items": [dict(item) for item in category_info.get("items", [])],
+        }
+        for category_id, category_info in app_data.items()
+    }
+
+
+def write_snapshot(path, app_data, tables, watermarks, schema_version, source):
+    """
+    Atomically write the processed catalog to a gzip-compressed pickle,
+    tagged with the schema version, data source and per-table watermarks.
+    """
+    payload = {
+        "schema_version": schema_version,
+        "source": source,
+        "written_at": time.time(),
+        "tables": dict(tables),
+        "watermarks": dict(watermarks),
+        "app_data": _to_plain(app_data),
+    }
+
+    with atomic_write(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path, schema_version, source):
+    """
+    Read a catalog snapshot. Returns the payload dict, or None when the file
+    is missing, unreadable, or was written for another schema version or source.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with gzip.open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable catalog snapshot {path}: {e}")
+        return None
+
+    if payload.get("schema_version") != schema_version:
+        return None
+    if payload.get("source") != source:
+        return None
+
+    return payload
@@ -0,0 +1,81 @@
+import threading
+import time
+
+
+def candidate_table_names(category_id):
+    """Table naming conventions tried for a category, in priority order"""
+    return [
+        f"{category_id}_items",
+        f"{category_id.upper()}_ITEMS",
+        f"items_{category_id}",
+        f"ITEMS_{category_id.upper()}",
+        category_id,
+        category_id.upper(),
+        "ARTISTS",  # Add ARTISTS table specifically
+    ]
+
+
+class TableResolver:
+    """
+    Caches the schema layout (tables and their columns) for ttl seconds.
+
+    The schema is introspected with a single INFORMATION_SCHEMA query and
+    each category is mapped to its table once, so loaders no longer run
+    SHOW TABLES or probe naming conventions on every call.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._columns = {}
+        self._category_tables = {}
+        self._loaded_at = None
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def _introspect(self, cursor):
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = CURRENT_SCHEMA() "
+            "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        )
+        columns = {}
+        for table_name, column_name in cursor.fetchall():
+            columns.setdefault(table_name, []).append(column_name)
+
+        self._columns = columns
+        self._category_tables = {}
+        self._loaded_at = time.monotonic()
+
+    def ensure_fresh(self, cursor):
+        """Re-introspect the schema if the cached layout has expired"""
+        with self._lock:
+            if self._is_stale():
+                self._introspect(cursor)
+
+    def table_for(self, cursor, category_id):
+        """Return the table holding a category's items, or None"""
+        self.ensure_fresh(cursor)
+        with self._lock:
+            if category_id not in self._category_tables:
+                self._category_tables[category_id] = next(
+                    (
+                        name
+                        for name in candidate_table_names(category_id)
+                        if name in self._columns
+                    ),
+                    None,
+                )
+            return self._category_tables[category_id]
+
+    def columns_for(self, cursor, table_name):
+        """Return the column names of a table (empty if unknown)"""
+        self.ensure_fresh(cursor)
+        with self._lock:
+            return list(self._columns.get(table_name, []))
+
+    def invalidate(self):
+        """Drop the cached layout, e.g. after a query against a stale table fails"""
+        with self._lock:
+            self._loaded_at = None
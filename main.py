@@ -1,6 +1,6 @@
 import streamlit as st
 from config.settings import PAGE_CONFIG
-from loaders.data_loader import load_all_data_streamlit
+from loaders.data_loader import get_catalog
 from utils.session import initialize_session_state
 from utils.router import router
 from pages import home, category_detail, item_detail
@@ -236,6 +236,13 @@ def apply_custom_css():
         transition: transform 0.3s ease;
     }
     
+    .card-image-container picture,
+    .item-image-container picture {
+        display: block;
+        width: 100%;
+        height: 100%;
+    }
+    
     .category-card:hover .card-image-container img {
         transform: scale(1.05);
     }
@@ -760,7 +767,7 @@ def main():
     enhanced_scroll_to_top()
 
     # Load data
-    app_data = load_all_data_streamlit()
+    app_data = get_catalog()
 
     if app_data is None:
         st.error("Unable to load application data. Please check your data directory.")
@@ -5,6 +5,7 @@ from components.cards import (
     render_featured_card,
     render_compact_item_list,
 )
+from config.settings import IMAGE_CARD_WIDTH
 
 
 def ensure_top_scroll():
@@ -238,7 +239,7 @@ def render_detailed_list_item(item, category_id, item_index):
     """Render a single item in detailed list format."""
     from components.cards import get_item_image_url, get_item_preview
 
-    image_url = get_item_image_url(item)
+    image_url = get_item_image_url(item, IMAGE_CARD_WIDTH)
     item_title = item.get("title", "Untitled Item")
     preview_text = get_item_preview(item)
 
@@ -1,10 +1,15 @@
+import time
 import streamlit as st
 from components.navigation import render_back_to_category_button
 from components.image_gallery import render_image_gallery
 from components.content_sections import render_content_sections
 from utils.formatters import format_section_title
-from utils.story_gen import generate_story  # Fixed typo: was 'stroy_gen'
+from utils.story_gen import get_story_generator
+from utils.story_jobs import get_story_worker
+from config.settings import STORY_JOB_POLL_INTERVAL
 from components.map_view import render_street_view
+from loaders.data_loader import load_full_item
+from utils.session import get_selected_item
 
 
 def ensure_top_scroll():
@@ -32,12 +37,17 @@ def ensure_top_scroll():
 def render(app_data):
     ensure_top_scroll()
     """Render the enhanced item detail page."""
-    selected_item = st.session_state.selected_item
+    selected_item = get_selected_item(app_data)
 
     if not selected_item:
         render_no_item_selected()
         return
 
+    # Catalog rows only hold card fields; fetch the complete item
+    selected_item = load_full_item(
+        st.session_state.get("selected_category"), selected_item
+    )
+
     render_item_details(selected_item)
 
 
@@ -66,10 +76,8 @@ def render_no_item_selected():
 def render_item_details(selected_item):
     """Render detailed information about an item with enhanced styling."""
     # Initialize session state variables if they don't exist
-    if "story_loading" not in st.session_state:
-        st.session_state.story_loading = False
-    if "generated_story" not in st.session_state:
-        st.session_state.generated_story = None
+    if "story_title" not in st.session_state:
+        st.session_state.story_title = None
     if "map_loading" not in st.session_state:
         st.session_state.map_loading = False
 
@@ -84,24 +92,40 @@ def render_item_details(selected_item):
 
     # Check if selected item has changed and clear previous story/loading state
     if st.session_state.get("current_item_title") != selected_item.get("title"):
-        st.session_state.generated_story = None
-        st.session_state.story_loading = False
+        st.session_state.story_title = None
         st.session_state.current_item_title = selected_item.get("title")
 
+    # Stories are generated by a background worker and read back from its
+    # job queue (keyed like the story cache, by title, prompt version and
+    # model). A job may already exist, e.g. one started before the user
+    # navigated away and came back.
+    title = selected_item.get("title")
+    generated_story = None
+    story_job = get_story_worker().find(title, selected_item)
+    if story_job and story_job["status"] == "done":
+        generated_story = story_job["result"]
+        st.session_state.story_title = title
+    story_pending = story_job is not None and story_job["status"] in (
+        "queued",
+        "running",
+    )
+
     # Display button or loading/story
-    if not st.session_state.story_loading and st.session_state.generated_story is None:
+    if not story_pending and generated_story is None:
+        if story_job and story_job["status"] == "failed":
+            st.warning(story_job["error"] or "Story generation failed.")
         if st.button(
             "📜 View Historical Significance Story",
             key="gen_story_btn",
             use_container_width=True,
         ):
-            st.session_state.story_loading = True
-            # Story generation is handled in the subsequent block on rerun
+            get_story_worker().submit(title, selected_item)
+            # Progress is shown by polling the job on the following reruns
             st.rerun()
 
-    if st.session_state.story_loading:
+    if story_pending:
         # Colorful AI loading animation with model name
-        model_name = "gemini-2.5-flash-preview-04-17"  # Explicitly use the model name
+        model_name = get_story_generator().model_name
         # Define CSS separately
         loading_css = """
         <style>
@@ -118,44 +142,23 @@ def render_item_details(selected_item):
             <p style="color: var(--text-secondary); font-size: 0.9rem;">This may take a moment as AI analyzes historical context and writes.</p>
         </div>
         """
-        st.markdown(loading_html, unsafe_allow_html=True)
-        # Trigger the story generation function call immediately in the script rerun
-        # The function call is now outside the button check but inside the loading state check
-        if st.session_state.generated_story is None and st.session_state.get(
-            "current_item_title"
-        ) == selected_item.get("title"):
-            story = generate_story(selected_item.get("title", "Untitled"))
-            st.session_state.generated_story = story
-            st.session_state.story_loading = False
-            st.rerun()  # Rerun one more time to display the story
+        # Show the text streamed so far, the queue position, or the animation
+        if story_job["partial"]:
+            st.markdown(story_card_html(story_job["partial"]), unsafe_allow_html=True)
+        elif story_job["queue_position"]:
+            st.markdown(
+                queue_position_html(story_job["queue_position"]),
+                unsafe_allow_html=True,
+            )
+        else:
+            st.markdown(loading_html, unsafe_allow_html=True)
 
     # Display the story if it's generated and matches the current item
-    if st.session_state.generated_story is not None and st.session_state.get(
+    if generated_story is not None and st.session_state.get(
         "current_item_title"
     ) == selected_item.get("title"):
         # Styled story output
-        st.markdown(
-            f"""
-        <div style="
-            background: var(--surface-bg);
-            padding: 2rem;
-            border-radius: 15px;
-            margin: 2rem 0;
-            border: 2px solid var(--highlight-color);
-            box-shadow: 0 6px 25px rgba(0,0,0,0.15);
-        ">
-            <div style="display: flex; align-items: center; gap: 15px; margin-bottom: 1.8rem; color: var(--highlight-color);">
-                <svg xmlns="http://www.w3.org/2000/svg" width="28" height="28" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21l-7-5-7 5V5a2 2 0 0 1 2-2h10a2 2 0 0 1 2 2z"></path></svg>
-                <h4 style="margin: 0; font-size: 1.6rem; font-weight: 700; color: var(--text-light);">Historical Significance</h4>
-            </div>
-            <p style="font-size: 0.9em; color: var(--text-muted); margin-top: -1.5rem; margin-bottom: 1.5rem;">Generated by AI</p>
-            <div style="color: var(--text-secondary); line-height: 1.8; font-size: 1.1rem; white-space: pre-wrap; overflow-wrap: break-word;">
-                {st.session_state.generated_story}
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
+        st.markdown(story_card_html(generated_story), unsafe_allow_html=True)
 
     # Street View section for architecture items
     category_id = st.session_state.get("selected_category")
@@ -213,6 +216,45 @@ def render_item_details(selected_item):
     # Accessibility Info
     render_accessibility_info()
 
+    # Poll the story job once the rest of the page has rendered; any
+    # interaction in the meantime starts a new run
+    if story_pending:
+        time.sleep(STORY_JOB_POLL_INTERVAL)
+        st.rerun()
+
+
+def queue_position_html(position):
+    """Return the notice shown while a story request waits for a model slot."""
+    return f"""
+    <div style="display: flex; flex-direction: column; align-items: center; margin: 3rem 0; padding: 2rem; background: var(--surface-bg); border-radius: 15px; border: 2px solid var(--primary-color);">
+        <div style="width: 80px; height: 80px; border-radius: 50%; background: conic-gradient(from 0deg, #4A90E2, #6FB3E0, #F1F5F9, #FFD700, #FF6F61, #4A90E2); animation: spin 1.5s linear infinite; margin-bottom: 1.5rem;"></div>
+        <p style="color: var(--text-light); font-weight: bold; font-size: 1.3rem; text-align: center;">Many stories are being written right now. You are #{position} in the queue...</p>
+    </div>
+    """
+
+
+def story_card_html(story):
+    """Return the styled card showing a (possibly partial) story."""
+    return f"""
+    <div style="
+        background: var(--surface-bg);
+        padding: 2rem;
+        border-radius: 15px;
+        margin: 2rem 0;
+        border: 2px solid var(--highlight-color);
+        box-shadow: 0 6px 25px rgba(0,0,0,0.15);
+    ">
+        <div style="display: flex; align-items: center; gap: 15px; margin-bottom: 1.8rem; color: var(--highlight-color);">
+            <svg xmlns="http://www.w3.org/2000/svg" width="28" height="28" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21l-7-5-7 5V5a2 2 0 0 1 2-2h10a2 2 0 0 1 2 2z"></path></svg>
+            <h4 style="margin: 0; font-size: 1.6rem; font-weight: 700; color: var(--text-light);">Historical Significance</h4>
+        </div>
+        <p style="font-size: 0.9em; color: var(--text-muted); margin-top: -1.5rem; margin-bottom: 1.5rem;">Generated by AI</p>
+        <div style="color: var(--text-secondary); line-height: 1.8; font-size: 1.1rem; white-space: pre-wrap; overflow-wrap: break-word;">
+            {story}
+        </div>
+    </div>
+    """
+
 
 def render_item_title_with_back_button(selected_item):
     """Render the item title with enhanced styling and back button."""
@@ -186,7 +186,7 @@ elif st.session_state.view == 'item_detail':
         st.title(selected_item.get("title", "Untitled Item"))
 
         # Display all other key-value pairs and lists
-        excluded_keys = ['images', 'title', 'generated_at', 'last_modified', 'references']
+        excluded_keys = ['images', 'image_placeholders', 'item_id', 'title', 'generated_at', 'last_modified', 'references']
         for key, value in selected_item.items():
             if key not in excluded_keys:
                 st.subheader(key.replace('_', ' ').upper())
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+
+from utils.http_client import HttpClient
+from utils.image_pipeline import Image
+from utils.image_proxy import ImageProxy, ImageStore
+
+pytestmark = pytest.mark.skipif(Image is None, reason="Pillow is not installed")
+
+
+def jpeg_bytes(color, size=(64, 48)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def etag_for(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+class ImageServer:
+    """Local stand-in for an image host: serves /<name> with a content ETag"""
+
+    def __init__(self, images):
+        self.images = images
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.lstrip("/")
+                server.requests.append((name, self.headers.get("If-None-Match")))
+                if name not in server.images:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                etag = etag_for(server.images[name])
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = server.images[name]
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.httpd.server_port}/{name}"
+
+
+@pytest.fixture
+def server():
+    colors = {"a.jpg": "red", "b.jpg": "green", "c.jpg": "blue"}
+    images = {name: jpeg_bytes(color) for name, color in colors.items()}
+    server = ImageServer(images)
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+class CommonsClient:
+    """Sends upload.wikimedia.org requests to the local server instead"""
+
+    def __init__(self, server):
+        self.client = HttpClient(max_retries=0, rate_limiter=None)
+        self.server = server
+
+    def get(self, url, **kwargs):
+        local = url.replace("https://upload.wikimedia.org/", self.server.url(""))
+        return self.client.get(local, **kwargs)
+
+
+def make_proxy(tmp_path, max_bytes=10 * 1024 * 1024, client=None, **kwargs):
+    store = ImageStore(str(tmp_path / "store"), max_bytes, touch_after=0)
+    if client is None:
+        client = HttpClient(max_retries=0, rate_limiter=None)
+    return ImageProxy(
+        store, str(tmp_path / "variants"), client=client, workers=1, **kwargs
+    )
+
+
+def test_fetch_downloads_once(tmp_path, server):
+    proxy = make_proxy(tmp_path)
+    url = server.url("a.jpg")
+
+    digest = proxy.fetch(url)
+    assert digest is not None
+    assert proxy.fetch(url) == digest
+    assert server.requests == [("a.jpg", None)]
+    with open(proxy.store.blob_path(digest), "rb") as f:
+        assert f.read() == server.images["a.jpg"]
+
+
+def test_revalidation_uses_conditional_get(tmp_path, server):
+    proxy = make_proxy(tmp_path, revalidate_after=0)
+    url = server.url("a.jpg")
+
+    digest = proxy.fetch(url)
+    validated_at = proxy.store.get(url)["validated_at"]
+    assert proxy.fetch(url) == digest
+
+    etag = etag_for(server.images["a.jpg"])
+    assert server.requests == [("a.jpg", None), ("a.jpg", etag)]
+    assert proxy.store.get(url)["validated_at"] >= validated_at
+
+
+def test_oversized_image_is_not_stored(tmp_path, server):
+    proxy = make_proxy(tmp_path, max_image_bytes=100)
+    url = server.url("a.jpg")
+
+    assert proxy.fetch(url) is None
+    assert proxy.store.get(url) is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, server):
+    # Room for two of the three images
+    size = max(len(body) for body in server.images.values())
+    proxy = make_proxy(tmp_path, max_bytes=2 * size + size // 2)
+    a, b, c = (server.url(name) for name in ("a.jpg", "b.jpg", "c.jpg"))
+
+    proxy.fetch(a)
+    proxy.fetch(b)
+    # Reading a makes b the least recently used
+    assert proxy.store.get(a) is not None
+    proxy.fetch(c)
+
+    assert proxy.store.get(a) is not None
+    assert proxy.store.get(b) is None
+    assert proxy.store.get(c) is not None
+    assert proxy.store.stats()["urls"] == 2
+
+
+def test_eviction_removes_variants(tmp_path, server):
+    size = max(len(body) for body in server.images.values())
+    proxy = make_proxy(tmp_path, max_bytes=size + size // 2)
+    a, b = server.url("a.jpg"), server.url("b.jpg")
+
+    variant = proxy.ensure_variant(a, 32)
+    assert variant is not None and os.path.exists(variant)
+    with Image.open(variant) as image:
+        assert image.format == "WEBP"
+        assert image.width == 32
+
+    blob = proxy.store.blob_path(proxy.store.get(a)["digest"])
+    proxy.fetch(b)
+
+    assert not os.path.exists(variant)
+    assert not os.path.exists(blob)
+
+
+def test_changed_content_replaces_old_blob(tmp_path, server):
+    proxy = make_proxy(tmp_path, revalidate_after=0)
+    url = server.url("a.jpg")
+
+    old_digest = proxy.fetch(url)
+    old_variant = proxy.ensure_variant(url, 32)
+    server.images["a.jpg"] = jpeg_bytes("yellow")
+    new_digest = proxy.fetch(url)
+
+    assert new_digest != old_digest
+    assert not os.path.exists(proxy.store.blob_path(old_digest))
+    assert not os.path.exists(old_variant)
+    assert proxy.store.stats()["bytes"] == len(server.images["a.jpg"])
+
+
+def test_rejected_thumbnail_is_served_by_the_original(tmp_path, server):
+    original = "wikipedia/commons/a/ab/Small.jpg"
+    server.images[original] = server.images["a.jpg"]
+    proxy = make_proxy(tmp_path, client=CommonsClient(server), revalidate_after=0)
+    original_url = f"https://upload.wikimedia.org/{original}"
+    thumbnail_url = (
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/a/ab/Small.jpg/500px-Small.jpg"
+    )
+
+    digest = proxy.fetch(thumbnail_url)
+    assert digest is not None
+    # The original is stored under its own URL with its own validators
+    assert proxy.store.get(original_url)["etag"] is not None
+    assert proxy.store.get(thumbnail_url)["digest"] == digest
+    assert proxy.store.get(thumbnail_url)["etag"] is None
+
+    # Revalidation asks for the original conditionally instead of downloading it again
+    server.requests.clear()
+    assert proxy.fetch(thumbnail_url) == digest
+    original_requests = [etag for name, etag in server.requests if name == original]
+    assert original_requests == [proxy.store.get(original_url)["etag"]]
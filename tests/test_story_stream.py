@@ -0,0 +1,34 @@
+import time
+
+from utils.admission import QueuePosition
+from utils.story_gen import StoryGenerator
+from utils.stub_model import StubGenerativeModel
+
+STORY = "The Taj Mahal was commissioned in 1632. " * 5
+
+ITEM = {
+    "title": "Taj Mahal",
+    "summary": "An ivory-white marble mausoleum in Agra.",
+    "key_points": ["Built by Shah Jahan", "UNESCO World Heritage Site"],
+}
+
+
+def test_stream_story_text_yields_chunks_as_they_arrive():
+    generator = StoryGenerator()
+    delay = 0.05
+    generator.model = StubGenerativeModel(chunk_size=20, delay=delay, text=STORY)
+
+    started = time.monotonic()
+    arrivals = []
+    for chunk in generator.stream_story_text("Taj Mahal", ITEM):
+        if isinstance(chunk, QueuePosition):
+            continue
+        arrivals.append((time.monotonic() - started, chunk))
+    finished = time.monotonic() - started
+
+    chunks = [text for _, text in arrivals]
+    assert len(chunks) == len(STORY) // 20
+    assert "".join(chunks) == STORY
+    # The first chunk is delivered well before the stream completes
+    first_arrival = arrivals[0][0]
+    assert first_arrival < finished - delay * (len(chunks) - 2)
@@ -0,0 +1,152 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from config.settings import (
+    LLM_BACKOFF_FACTOR,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE,
+    LLM_MIN_CONCURRENCY,
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the wait queue is full and a request is turned away."""
+
+
+class QueuePosition:
+    """Marker yielded by streams while a request waits for a model slot."""
+
+    def __init__(self, position):
+        self.position = position
+
+
+def is_rate_limit_error(error):
+    """True for provider rate-limit / quota errors (HTTP 429, ResourceExhausted)"""
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+class AdmissionController:
+    """
+    Process-wide gate in front of the model.
+
+    At most `limit` requests run at once; others wait in a FIFO queue of at
+    most max_queue entries and are rejected immediately once it is full.
+    The limit adapts AIMD-style: it is multiplied by backoff_factor when the
+    provider reports a rate limit and grows back by about one slot per
+    `limit` successful calls, between min_concurrency and max_concurrency.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        min_concurrency=LLM_MIN_CONCURRENCY,
+        max_queue=LLM_MAX_QUEUE,
+        backoff_factor=LLM_BACKOFF_FACTOR,
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_queue = max_queue
+        self.backoff_factor = backoff_factor
+
+        self._limit = float(max_concurrency)
+        self._active = set()
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self.rejected = 0
+        self.rate_limited = 0
+
+    @property
+    def limit(self):
+        return max(self.min_concurrency, int(self._limit))
+
+    def enqueue(self):
+        """Join the wait queue, returning a ticket. Raises AdmissionRejected if full."""
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise AdmissionRejected("Too many story requests are waiting")
+            ticket = object()
+            self._queue.append(ticket)
+            return ticket
+
+    def try_start(self, ticket, timeout=None):
+        """
+        Wait up to timeout seconds for the ticket to reach the head of the
+        queue with a free slot. Returns True once it is running.
+        """
+        with self._condition:
+            if ticket in self._active:
+                return True
+            ready = self._condition.wait_for(
+                lambda: self._queue[0] is ticket and len(self._active) < self.limit,
+                timeout=timeout,
+            )
+            if not ready:
+                return False
+            self._queue.popleft()
+            self._active.add(ticket)
+            # The next ticket may also fit under the limit
+            self._condition.notify_all()
+            return True
+
+    def position(self, ticket):
+        """1-based position of a waiting ticket (0 once it is running)"""
+        with self._condition:
+            if ticket in self._active:
+                return 0
+            try:
+                return self._queue.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def release(self, ticket):
+        """Free the ticket's slot, or remove it from the queue if it never ran"""
+        with self._condition:
+            if ticket in self._active:
+                self._active.discard(ticket)
+            else:
+                try:
+                    self._queue.remove(ticket)
+                except ValueError:
+                    pass
+            self._condition.notify_all()
+
+    def record_success(self):
+        with self._condition:
+            self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def record_rate_limit(self):
+        with self._condition:
+            self.rate_limited += 1
+            self._limit = max(self.min_concurrency, self._limit * self.backoff_factor)
+
+    @contextmanager
+    def admit(self):
+        """Block until admitted, holding a slot for the duration of the block"""
+        ticket = self.enqueue()
+        try:
+            self.try_start(ticket)
+            yield
+        finally:
+            self.release(ticket)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "active": len(self._active),
+                "queued": len(self._queue),
+                "rejected": self.rejected,
+                "rate_limited": self.rate_limited,
+            }
+
+
+# Shared gate for every model call made by the app
+llm_admission = AdmissionController()
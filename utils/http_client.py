@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRY_STATUSES,
+    HTTP_TIMEOUT,
+)
+from utils.rate_limit import host_rate_limiter
+
+
+class HostMetrics:
+    """Request counters and latency for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.status_counts = {}
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_seconds / self.requests * 1000, 1)
+            if self.requests
+            else 0.0,
+            "status_counts": dict(self.status_counts),
+        }
+
+
+class HttpClient:
+    """
+    Shared HTTP client for outbound calls.
+
+    Wraps one requests.Session so connections are kept alive and pooled per
+    host. Every request gets a (connect, read) timeout unless the caller
+    passes one, waits on the per-host rate limiter, and is retried on
+    connection errors, timeouts and retryable status codes with jittered
+    exponential backoff. Per-host metrics are available from metrics().
+    """
+
+    def __init__(
+        self,
+        timeout=HTTP_TIMEOUT,
+        max_retries=HTTP_MAX_RETRIES,
+        backoff_base=HTTP_BACKOFF_BASE,
+        backoff_max=HTTP_BACKOFF_MAX,
+        retry_statuses=HTTP_RETRY_STATUSES,
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        rate_limiter=host_rate_limiter,
+        session=None,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = set(retry_statuses)
+        self.rate_limiter = rate_limiter
+
+        if session is None:
+            session = requests.Session()
+            # Retries are handled here so they are jittered and counted
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _host_metrics(self, host):
+        with self._lock:
+            if host not in self._metrics:
+                self._metrics[host] = HostMetrics()
+            return self._metrics[host]
+
+    def _backoff(self, attempt, response=None):
+        """Full-jitter exponential backoff, honouring a numeric Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying transient failures. Returns the final
+        response (which may still carry an error status) or raises the last
+        requests exception once retries are exhausted.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).netloc
+        metrics = self._host_metrics(host)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(host)
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                with self._lock:
+                    metrics.requests += 1
+                    metrics.errors += 1
+                    metrics.total_seconds += time.monotonic() - started
+                if attempt == self.max_retries:
+                    raise
+                response = None
+            else:
+                with self._lock:
+                    metrics.requests += 1
+                    metrics.total_seconds += time.monotonic() - started
+                    metrics.status_counts[response.status_code] = (
+                        metrics.status_counts.get(response.status_code, 0) + 1
+                    )
+                if (
+                    response.status_code not in self.retry_statuses
+                    or attempt == self.max_retries
+                ):
+                    return response
+                # Release the connection back to the pool before retrying
+                response.close()
+
+            with self._lock:
+                metrics.retries += 1
+            time.sleep(self._backoff(attempt, response))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def metrics(self):
+        """Return per-host request metrics"""
+        with self._lock:
+            return {host: metrics.as_dict() for host, metrics in self._metrics.items()}
+
+
+# Shared client for all outbound HTTP requests made by the app
+http_client = HttpClient()
@@ -0,0 +1,300 @@
+"""
+HEAD-check every item image URL and record which ones are dead, so cards
+and the gallery stop picking images that will never load.
+
+Checks run concurrently with a global limit and a per-host limit, and
+are paced by the validator's own per-host rate limit (IMAGE_LINK_RATE_LIMIT)
+rather than the app-wide one. The status and last-checked time of each URL
+are stored in a SQLite index; URLs checked recently are skipped on the next
+run.
+
+Run from the repository root:
+    python -m utils.image_links [--source local|snowflake] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from config.settings import (
+    IMAGE_LINK_CONCURRENCY,
+    IMAGE_LINK_DB_PATH,
+    IMAGE_LINK_ERROR_RECHECK_AFTER,
+    IMAGE_LINK_PER_HOST,
+    IMAGE_LINK_RATE_LIMIT,
+    IMAGE_LINK_RECHECK_AFTER,
+    IMAGE_PROXY_USER_AGENT,
+)
+from utils.storage import sqlite_connection
+
+# Statuses meaning the file is gone; anything else may be transient
+BROKEN_STATUSES = {404, 410}
+
+# Statuses from servers that refuse HEAD; those URLs are retried with a GET
+HEAD_NOT_ALLOWED = {405, 501}
+
+# Results written to the index every this many checks
+RECORD_EVERY = 50
+
+
+class LinkStatusIndex:
+    """
+    SQLite table of image URL statuses: "ok", "broken" (the server says
+    the file is gone) or "error" (timeouts, 5xx, rate limits), with the
+    HTTP status and the time of the last check.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS links (
+                    url TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    http_status INTEGER,
+                    error TEXT,
+                    checked_at REAL NOT NULL
+                )
+                """
+            )
+
+    def checked_since(self, since, error_since):
+        """
+        URLs whose last check is newer than the given timestamp. Checks that
+        ended in an error only count if newer than error_since, so transient
+        failures are retried sooner.
+        """
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                "SELECT url FROM links WHERE checked_at >= "
+                "CASE WHEN status = 'error' THEN ? ELSE ? END",
+                (error_since, since),
+            ).fetchall()
+        return {url for (url,) in rows}
+
+    def record_many(self, results):
+        with sqlite_connection(self.path) as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO links (url, status, http_status, error, checked_at)
+                VALUES (:url, :status, :http_status, :error, :checked_at)
+                """,
+                results,
+            )
+
+    def stats(self):
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM links GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+
+_broken = {"path": None, "mtime": None, "urls": frozenset()}
+_broken_lock = threading.Lock()
+
+
+def known_broken_urls(path=IMAGE_LINK_DB_PATH):
+    """
+    Set of image URLs last recorded as broken. The index is re-read only
+    when its modification time changes.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return frozenset()
+
+    with _broken_lock:
+        if _broken["path"] != path or _broken["mtime"] != mtime:
+            try:
+                conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+                try:
+                    rows = conn.execute(
+                        "SELECT url FROM links WHERE status = 'broken'"
+                    ).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Could not read image link index {path}: {e}")
+                rows = []
+            _broken.update(path=path, mtime=mtime, urls=frozenset(url for (url,) in rows))
+        return _broken["urls"]
+
+
+def usable_image_indices(item):
+    """Indices of the item's images not known to be broken"""
+    broken = known_broken_urls()
+    return [
+        index
+        for index, url in enumerate(item.get("images") or [])
+        if isinstance(url, str) and url not in broken
+    ]
+
+
+def check_url(client, url):
+    """HEAD one URL (falling back to GET if HEAD is refused) and classify it"""
+    headers = {"User-Agent": IMAGE_PROXY_USER_AGENT}
+    result = {"url": url, "http_status": None, "error": None, "checked_at": time.time()}
+    try:
+        response = client.head(url, headers=headers, allow_redirects=True)
+        if response.status_code in HEAD_NOT_ALLOWED:
+            response = client.get(url, headers=headers, stream=True)
+            response.close()
+    except Exception as e:
+        result.update(status="error", error=str(e))
+        return result
+
+    result["http_status"] = response.status_code
+    if response.status_code < 400:
+        result["status"] = "ok"
+    elif response.status_code in BROKEN_STATUSES:
+        result["status"] = "broken"
+    else:
+        result["status"] = "error"
+    return result
+
+
+async def check_urls(urls, client, concurrency, per_host, on_result):
+    """
+    Check URLs with at most `concurrency` requests in flight overall and
+    `per_host` per host, calling on_result(result) as each one finishes.
+    The blocking HTTP client runs on a thread pool sized to the limit.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="image-links")
+    )
+    slots = asyncio.Semaphore(concurrency)
+    host_slots = {}
+
+    async def check(url):
+        host = urlparse(url).netloc
+        host_slot = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        # Take the host slot first so a busy host cannot hold global slots idle
+        async with host_slot, slots:
+            return await asyncio.to_thread(check_url, client, url)
+
+    for future in asyncio.as_completed([check(url) for url in urls]):
+        on_result(await future)
+
+
+def validate_links(
+    items,
+    path=IMAGE_LINK_DB_PATH,
+    concurrency=IMAGE_LINK_CONCURRENCY,
+    per_host=IMAGE_LINK_PER_HOST,
+    recheck_after=IMAGE_LINK_RECHECK_AFTER,
+    error_recheck_after=IMAGE_LINK_ERROR_RECHECK_AFTER,
+    force=False,
+    client=None,
+    rate_limit=IMAGE_LINK_RATE_LIMIT,
+):
+    """
+    Check the image URLs of the given items. Returns a summary dict.
+    Without a client, one is created with its own per-host limiter at
+    rate_limit (requests per second, burst).
+    """
+    if client is None:
+        from utils.http_client import HttpClient
+        from utils.rate_limit import HostRateLimiter
+
+        client = HttpClient(rate_limiter=HostRateLimiter(default_limit=rate_limit))
+
+    index = LinkStatusIndex(path)
+    now = time.time()
+    recent = (
+        set()
+        if force
+        else index.checked_since(now - recheck_after, now - error_recheck_after)
+    )
+
+    urls = []
+    seen = set()
+    for item in items:
+        for url in item.get("images") or []:
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                continue
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+    pending = [url for url in urls if url not in recent]
+
+    counts = {"ok": 0, "broken": 0, "error": 0, "skipped": len(urls) - len(pending)}
+    print(
+        f"{len(pending)} image URLs to check, {counts['skipped']} checked recently "
+        f"({concurrency} concurrent, {per_host} per host, "
+        f"{rate_limit[0]:g} requests/s per host)"
+    )
+
+    batch = []
+    started = time.monotonic()
+
+    def on_result(result):
+        counts[result["status"]] += 1
+        batch.append(result)
+        if result["status"] == "broken":
+            print(f"Broken ({result['http_status']}): {result['url']}")
+        if len(batch) >= RECORD_EVERY:
+            index.record_many(batch)
+            batch.clear()
+            done = counts["ok"] + counts["broken"] + counts["error"]
+            elapsed = time.monotonic() - started
+            print(f"[{done}/{len(pending)}] {done / elapsed:.1f} URLs/s")
+
+    asyncio.run(check_urls(pending, client, concurrency, per_host, on_result))
+    if batch:
+        index.record_many(batch)
+
+    return {**counts, "elapsed": time.monotonic() - started}
+
+
+def main():
+    from utils.story_batch import local_items, snowflake_items
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=["local", "snowflake"], default="local")
+    parser.add_argument("--concurrency", type=int, default=IMAGE_LINK_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=IMAGE_LINK_PER_HOST)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=IMAGE_LINK_RATE_LIMIT[0],
+        help="Requests per second per host",
+    )
+    parser.add_argument("--index", default=IMAGE_LINK_DB_PATH)
+    parser.add_argument("--limit", type=int, help="Only process the first N items")
+    parser.add_argument(
+        "--force", action="store_true", help="Re-check URLs checked recently"
+    )
+    args = parser.parse_args()
+
+    items = local_items() if args.source == "local" else snowflake_items()
+    if args.limit:
+        items = items[: args.limit]
+
+    summary = validate_links(
+        items,
+        path=args.index,
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        force=args.force,
+        rate_limit=(args.rate, args.per_host),
+    )
+    print(
+        f"Done in {summary['elapsed']:.1f}s: {summary['ok']} ok, "
+        f"{summary['broken']} broken, {summary['error']} errors, "
+        f"{summary['skipped']} skipped"
+    )
+
+
+if __name__ == "__main__":
+    main()
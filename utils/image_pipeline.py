@@ -0,0 +1,280 @@
+"""
+Build resized WebP/JPEG derivatives of the local category card images
+and record them in a manifest next to the files.
+
+The app builds missing derivatives on a background thread and serves the
+original images until they exist; run this ahead of deploys so the first
+visitors already get the small versions. From the repository root:
+    python -m utils.image_pipeline
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+
+import streamlit as st
+
+from config.settings import (
+    CATEGORY_CARD_IMAGES,
+    IMAGE_DERIVATIVE_DIR,
+    IMAGE_DERIVATIVE_FORMATS,
+    IMAGE_DERIVATIVE_QUALITY,
+    IMAGE_DERIVATIVE_WIDTHS,
+    STATIC_ROOT,
+    STATIC_URL_PREFIX,
+)
+from utils.storage import atomic_write
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+MANIFEST_NAME = "manifest.json"
+
+# Pillow save format and MIME type for each derivative format
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def static_url(path):
+    """URL under which Streamlit's static file serving exposes a file in static/"""
+    relative = os.path.relpath(path, STATIC_ROOT).replace(os.sep, "/")
+    return f"{STATIC_URL_PREFIX}/{relative}"
+
+
+def build_derivatives(source_path, out_dir, widths, formats, quality):
+    """
+    Write resized copies of an image at each width and format.
+
+    File names include a hash of the source contents and settings, so a
+    changed original gets new URLs and browsers can cache them forever.
+    Returns a list of variant dicts (width, height, format, path, url).
+    """
+    settings_key = f"{widths}:{formats}:{quality}"
+    content_hash = hashlib.sha256(
+        (file_digest(source_path) + settings_key).encode("utf-8")
+    ).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+
+    variants = []
+    with Image.open(source_path) as original:
+        original.load()
+        for width in sorted(set(widths)):
+            # Never upscale; the largest variant is at most the original width
+            target_width = min(width, original.width)
+            target_height = round(original.height * target_width / original.width)
+            resized = original.resize((target_width, target_height), Image.LANCZOS)
+
+            for fmt in formats:
+                pil_format, _ = FORMATS[fmt]
+                extension = "jpg" if fmt == "jpeg" else fmt
+                path = os.path.join(
+                    out_dir, f"{stem}-{content_hash}-{target_width}w.{extension}"
+                )
+                if not os.path.exists(path):
+                    image = resized
+                    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+                        image = image.convert("RGB")
+                    image.save(path, pil_format, quality=quality, optimize=True)
+                variants.append(
+                    {
+                        "width": target_width,
+                        "height": target_height,
+                        "format": fmt,
+                        "path": path,
+                        "url": static_url(path),
+                    }
+                )
+
+            if target_width == original.width:
+                break
+
+    return variants
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def write_manifest(path, manifest):
+    with atomic_write(path) as f:
+        json.dump(manifest, f, indent=2)
+
+
+def manifest_signature(source_path, widths, formats, quality):
+    stat = os.stat(source_path)
+    return [stat.st_size, stat.st_mtime, widths, formats, quality]
+
+
+def current_variants(manifest, source_path, signature):
+    """Variants recorded for a source, or None if they are stale or missing"""
+    entry = manifest.get(source_path)
+    if (
+        entry
+        and entry["signature"] == signature
+        and all(os.path.exists(variant["path"]) for variant in entry["variants"])
+    ):
+        return entry["variants"]
+    return None
+
+
+def build_image_manifest(
+    sources,
+    out_dir=IMAGE_DERIVATIVE_DIR,
+    widths=IMAGE_DERIVATIVE_WIDTHS,
+    formats=IMAGE_DERIVATIVE_FORMATS,
+    quality=IMAGE_DERIVATIVE_QUALITY,
+):
+    """
+    Build derivatives for {key: source path} and return {key: variants}.
+
+    The manifest on disk records each source's size and mtime, so sources
+    that have not changed are not re-read or re-encoded.
+    """
+    if Image is None:
+        print("Pillow is not installed; serving original category images")
+        return {}
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    changed = False
+    result = {}
+
+    for key, source_path in sources.items():
+        if not os.path.exists(source_path):
+            continue
+        signature = manifest_signature(source_path, widths, formats, quality)
+        variants = current_variants(manifest, source_path, signature)
+        if variants is not None:
+            result[key] = variants
+            continue
+
+        try:
+            variants = build_derivatives(source_path, out_dir, widths, formats, quality)
+        except Exception as e:
+            print(f"Could not build derivatives for {source_path}: {e}")
+            continue
+        manifest[source_path] = {"signature": signature, "variants": variants}
+        result[key] = variants
+        changed = True
+
+    if changed:
+        write_manifest(manifest_path, manifest)
+    return result
+
+
+def read_image_manifest(
+    sources,
+    out_dir=IMAGE_DERIVATIVE_DIR,
+    widths=IMAGE_DERIVATIVE_WIDTHS,
+    formats=IMAGE_DERIVATIVE_FORMATS,
+    quality=IMAGE_DERIVATIVE_QUALITY,
+):
+    """
+    {key: variants} for the sources whose derivatives are already built and
+    current, plus the keys still missing. Never decodes or encodes images.
+    """
+    manifest = load_manifest(os.path.join(out_dir, MANIFEST_NAME))
+    result = {}
+    missing = []
+    for key, source_path in sources.items():
+        if not os.path.exists(source_path):
+            continue
+        signature = manifest_signature(source_path, widths, formats, quality)
+        variants = current_variants(manifest, source_path, signature)
+        if variants is None:
+            missing.append(key)
+        else:
+            result[key] = variants
+    return result, missing
+
+
+@st.cache_resource
+def start_category_image_build():
+    """Build the category derivatives on a background thread, once per process"""
+    thread = threading.Thread(
+        target=build_image_manifest,
+        args=(CATEGORY_CARD_IMAGES,),
+        name="image-derivatives",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def get_category_image_variants():
+    """
+    Derivatives of the local category card images that are already built.
+    Missing ones are built in the background, and cards show the original
+    image until they are ready.
+    """
+    variants, missing = read_image_manifest(CATEGORY_CARD_IMAGES)
+    if missing and Image is not None:
+        start_category_image_build()
+    return variants
+
+
+def srcset(variants, fmt):
+    return ", ".join(
+        f"{variant['url']} {variant['width']}w"
+        for variant in variants
+        if variant["format"] == fmt
+    )
+
+
+def picture_html(variants, alt, sizes, fallback_src=None):
+    """
+    Return a <picture> element offering WebP with a JPEG fallback, letting
+    the browser pick the smallest width that fills the rendered size.
+    """
+    sources = []
+    webp_srcset = srcset(variants, "webp")
+    if webp_srcset:
+        sources.append(
+            f'<source type="{FORMATS["webp"][1]}" srcset="{webp_srcset}" sizes="{sizes}" />'
+        )
+
+    jpeg_variants = [variant for variant in variants if variant["format"] == "jpeg"]
+    src = jpeg_variants[0]["url"] if jpeg_variants else fallback_src
+    img_srcset = srcset(variants, "jpeg")
+    srcset_attr = f' srcset="{img_srcset}" sizes="{sizes}"' if img_srcset else ""
+
+    return (
+        "<picture>"
+        + "".join(sources)
+        + f'<img src="{src}"{srcset_attr} alt="{alt}" loading="lazy" decoding="async" />'
+        + "</picture>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+
+    variants = build_image_manifest(CATEGORY_CARD_IMAGES)
+    for key, key_variants in sorted(variants.items()):
+        print(f"{key}: {len(key_variants)} variants")
+
+
+if __name__ == "__main__":
+    main()
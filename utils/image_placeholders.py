@@ -0,0 +1,217 @@
+"""
+Compute intrinsic dimensions and a tiny blurred placeholder (LQIP) for
+every item image, so cards can reserve layout space and paint something
+before the real image arrives.
+
+Results are stored in a JSON sidecar keyed by image URL and attached to
+items at ingest. Images already in the sidecar are skipped, and progress
+is saved as it goes so an interrupted run resumes where it stopped.
+
+Run from the repository root:
+    python -m utils.image_placeholders [--source local|snowflake] [--workers 4]
+"""
+import argparse
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+from config.settings import (
+    IMAGE_CARD_WIDTH,
+    IMAGE_PLACEHOLDER_BLUR,
+    IMAGE_PLACEHOLDER_PATH,
+    IMAGE_PLACEHOLDER_QUALITY,
+    IMAGE_PLACEHOLDER_SIZE,
+    IMAGE_PLACEHOLDER_WORKERS,
+)
+from utils.storage import atomic_write
+from utils.wikimedia import thumbnail_url
+
+# Entries saved to the sidecar every this many measured images
+SAVE_EVERY = 25
+
+_sidecar = {"path": None, "mtime": None, "entries": {}}
+_sidecar_lock = threading.Lock()
+
+
+def load_placeholders(path=IMAGE_PLACEHOLDER_PATH):
+    """
+    {image URL: {"width", "height", "placeholder"}} from the sidecar.
+    The file is re-read only when its modification time changes.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    with _sidecar_lock:
+        if _sidecar["path"] != path or _sidecar["mtime"] != mtime:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable image placeholders {path}: {e}")
+                entries = {}
+            _sidecar.update(path=path, mtime=mtime, entries=entries)
+        return _sidecar["entries"]
+
+
+def image_placeholders(images, entries):
+    """Sidecar entry (or None) for each image URL, in the same order"""
+    return [
+        entries.get(url) if isinstance(url, str) else None for url in images or []
+    ]
+
+
+def item_image_placeholder(item, index):
+    """
+    Sidecar entry for the item's index-th image: the one attached at
+    ingest, else a lookup in the sidecar (for items ingested before the
+    batch job last ran).
+    """
+    stored = item.get("image_placeholders") or []
+    if index < len(stored) and stored[index]:
+        return stored[index]
+    images = item.get("images") or []
+    if index < len(images) and isinstance(images[index], str):
+        return load_placeholders().get(images[index])
+    return None
+
+
+def placeholder_background(entry):
+    """CSS painting the blurred placeholder behind an image until it loads"""
+    if not entry:
+        return ""
+    return f"background: center / cover no-repeat url('{entry['placeholder']}');"
+
+
+def placeholder_attrs(entry):
+    """
+    HTML attributes for an <img> with a known entry: width/height so the
+    browser reserves the right box, plus the placeholder background.
+    """
+    if not entry:
+        return ""
+    return (
+        f'width="{entry["width"]}" height="{entry["height"]}" '
+        f'style="{placeholder_background(entry)}"'
+    )
+
+
+def placeholder_data_uri(image):
+    """Tiny blurred WebP of a Pillow image, as a data: URI"""
+    from PIL import ImageFilter
+
+    small = image.convert("RGB")
+    small.thumbnail((IMAGE_PLACEHOLDER_SIZE, IMAGE_PLACEHOLDER_SIZE))
+    small = small.filter(ImageFilter.GaussianBlur(IMAGE_PLACEHOLDER_BLUR))
+
+    buffer = BytesIO()
+    small.save(buffer, "WEBP", quality=IMAGE_PLACEHOLDER_QUALITY)
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/webp;base64,{encoded}"
+
+
+def measure_image(proxy, url):
+    """
+    Fetch the card-sized rendition of an image through the image proxy
+    (which also warms its cache) and return its sidecar entry, or None.
+    Commons thumbnails keep the original's aspect ratio.
+    """
+    from utils.image_pipeline import Image
+
+    digest = proxy.fetch(thumbnail_url(url, IMAGE_CARD_WIDTH) or url)
+    if digest is None:
+        return None
+
+    with Image.open(proxy.store.blob_path(digest)) as image:
+        image.load()
+        return {
+            "width": image.width,
+            "height": image.height,
+            "placeholder": placeholder_data_uri(image),
+        }
+
+
+def write_placeholders(path, entries):
+    # The app never reads a partial sidecar
+    with atomic_write(path) as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+
+
+def build_placeholders(items, workers, path=IMAGE_PLACEHOLDER_PATH, force=False):
+    """Measure every image of the given items. Returns a summary dict."""
+    from utils.image_pipeline import Image
+    from utils.image_proxy import get_image_proxy
+
+    if Image is None:
+        raise SystemExit("Pillow is required to compute image placeholders")
+
+    entries = {} if force else dict(load_placeholders(path))
+    pending = []
+    seen = set()
+    for item in items:
+        for url in item.get("images") or []:
+            if not isinstance(url, str) or url in seen:
+                continue
+            seen.add(url)
+            if url not in entries:
+                pending.append(url)
+
+    counts = {"measured": 0, "skipped": len(seen) - len(pending), "failed": 0}
+    print(f"{len(pending)} images to measure, {counts['skipped']} already done")
+
+    proxy = get_image_proxy()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(measure_image, proxy, url): url for url in pending}
+        for index, future in enumerate(as_completed(futures), start=1):
+            url = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                entry = None
+                print(f"[{index}/{len(pending)}] failed: {url}: {e}")
+            if entry is None:
+                counts["failed"] += 1
+                continue
+
+            entries[url] = entry
+            counts["measured"] += 1
+            if counts["measured"] % SAVE_EVERY == 0:
+                write_placeholders(path, entries)
+                print(f"[{index}/{len(pending)}] saved {len(entries)} entries")
+
+    write_placeholders(path, entries)
+    return {**counts, "elapsed": time.monotonic() - started}
+
+
+def main():
+    from utils.story_batch import local_items, snowflake_items
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=["local", "snowflake"], default="local")
+    parser.add_argument("--workers", type=int, default=IMAGE_PLACEHOLDER_WORKERS)
+    parser.add_argument("--output", default=IMAGE_PLACEHOLDER_PATH)
+    parser.add_argument("--limit", type=int, help="Only process the first N items")
+    parser.add_argument(
+        "--force", action="store_true", help="Re-measure images already in the sidecar"
+    )
+    args = parser.parse_args()
+
+    items = local_items() if args.source == "local" else snowflake_items()
+    if args.limit:
+        items = items[: args.limit]
+
+    summary = build_placeholders(items, args.workers, args.output, force=args.force)
+    print(
+        f"Done in {summary['elapsed']:.1f}s: {summary['measured']} measured, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
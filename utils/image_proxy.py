@@ -0,0 +1,399 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from config.settings import (
+    IMAGE_DERIVATIVE_QUALITY,
+    IMAGE_PROXY_MAX_BYTES,
+    IMAGE_PROXY_MAX_IMAGE_BYTES,
+    IMAGE_PROXY_REVALIDATE_AFTER,
+    IMAGE_PROXY_ROOT,
+    IMAGE_PROXY_TOUCH_AFTER,
+    IMAGE_PROXY_USER_AGENT,
+    IMAGE_PROXY_VARIANT_DIR,
+    IMAGE_PROXY_WORKERS,
+)
+from utils.http_client import http_client
+from utils.image_pipeline import Image, static_url
+from utils.storage import atomic_write, sqlite_connection
+from utils.wikimedia import original_url
+
+
+class ImageStore:
+    """
+    Content-addressed disk store for remote images.
+
+    Image bytes are stored once per SHA-256 digest; a SQLite index maps each
+    URL to its digest plus the validators (ETag, Last-Modified) needed for
+    conditional revalidation. Once the stored bytes exceed max_bytes the
+    least recently used URLs are dropped, along with blobs no longer
+    referenced by any URL. Access times are kept to within touch_after
+    seconds, so reads only write to the index occasionally.
+    """
+
+    def __init__(
+        self, root, max_bytes, on_blob_removed=None, touch_after=IMAGE_PROXY_TOUCH_AFTER
+    ):
+        self.root = root
+        self.db_path = os.path.join(root, "index.sqlite3")
+        self.max_bytes = max_bytes
+        self.touch_after = touch_after
+        self.on_blob_removed = on_blob_removed
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+
+        with sqlite_connection(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS images (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    validated_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS images_accessed ON images (accessed_at)"
+            )
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def get(self, url):
+        """Return the index entry for a URL as a dict, or None"""
+        with sqlite_connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT digest, size, etag, last_modified, validated_at, accessed_at "
+                "FROM images WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        digest, size, etag, last_modified, validated_at, accessed_at = row
+        if not os.path.exists(self.blob_path(digest)):
+            return None
+
+        # LRU order only needs to be coarse: refresh the access time when it
+        # is older than touch_after, so repeated reads stay read-only
+        now = time.time()
+        if now - accessed_at >= self.touch_after:
+            with self._lock, sqlite_connection(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE images SET accessed_at = ? WHERE url = ?", (now, url)
+                )
+        return {
+            "digest": digest,
+            "size": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "validated_at": validated_at,
+        }
+
+    def mark_validated(self, url):
+        """Record a 304 Not Modified answer for a URL"""
+        with self._lock, sqlite_connection(self.db_path) as conn:
+            conn.execute(
+                "UPDATE images SET validated_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def put(self, url, content, etag=None, last_modified=None):
+        """Store image bytes for a URL and return their digest"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            with atomic_write(path, "wb") as f:
+                f.write(content)
+
+        return self._index(url, digest, len(content), etag, last_modified)
+
+    def link(self, url, digest):
+        """
+        Point a URL at bytes already stored for another URL (e.g. a thumbnail
+        that is served by its original). The link has no validators of its own.
+        """
+        with sqlite_connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT size FROM images WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._index(url, digest, row[0], None, None)
+
+    def _index(self, url, digest, size, etag, last_modified):
+        """
+        Record url -> digest, then evict. The digest the URL pointed to
+        before is removed too if nothing references it any more, so changed
+        content does not leave unindexed blobs behind.
+        """
+        now = time.time()
+        with self._lock, sqlite_connection(self.db_path) as conn:
+            previous = conn.execute(
+                "SELECT digest FROM images WHERE url = ?", (url,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO images
+                    (url, digest, size, etag, last_modified, validated_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, digest, size, etag, last_modified, now, now),
+            )
+            removed = self._evict(conn, keep=url)
+            if previous and previous[0] != digest:
+                still_used = conn.execute(
+                    "SELECT 1 FROM images WHERE digest = ? LIMIT 1", (previous[0],)
+                ).fetchone()
+                if not still_used and previous[0] not in removed:
+                    removed.append(previous[0])
+
+        for removed_digest in removed:
+            self._remove_blob(removed_digest)
+        return digest
+
+    def _stored_bytes(self, conn):
+        return conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT digest, MAX(size) AS size FROM images GROUP BY digest)"
+        ).fetchone()[0]
+
+    def _evict(self, conn, keep):
+        """
+        Drop least recently used URLs (other than `keep`, the one just stored)
+        until under max_bytes; return digests no longer referenced.
+        """
+        total = self._stored_bytes(conn)
+        if total <= self.max_bytes:
+            return []
+
+        orphaned = []
+        for url, digest, size in conn.execute(
+            "SELECT url, digest, size FROM images ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            if url == keep:
+                continue
+            conn.execute("DELETE FROM images WHERE url = ?", (url,))
+            still_used = conn.execute(
+                "SELECT 1 FROM images WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if not still_used:
+                orphaned.append(digest)
+                total -= size
+        return orphaned
+
+    def _remove_blob(self, digest):
+        try:
+            os.remove(self.blob_path(digest))
+        except OSError:
+            pass
+        if self.on_blob_removed:
+            self.on_blob_removed(digest)
+
+    def stats(self):
+        with self._lock, sqlite_connection(self.db_path) as conn:
+            urls = conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+            total = self._stored_bytes(conn)
+        return {"urls": urls, "bytes": total}
+
+
+class ImageProxy:
+    """
+    Fetches remote images once into an ImageStore and serves resized WebP
+    variants from the static directory.
+
+    proxied_url() never blocks on the network: it returns the local variant
+    when one exists (scheduling a conditional GET if the entry is due for
+    revalidation) and otherwise queues a background fetch and returns the
+    original URL, so the page renders immediately and later runs get the
+    local copy.
+    """
+
+    def __init__(
+        self,
+        store,
+        variant_dir,
+        client=http_client,
+        revalidate_after=IMAGE_PROXY_REVALIDATE_AFTER,
+        max_image_bytes=IMAGE_PROXY_MAX_IMAGE_BYTES,
+        workers=IMAGE_PROXY_WORKERS,
+    ):
+        self.store = store
+        self.variant_dir = variant_dir
+        self.client = client
+        self.revalidate_after = revalidate_after
+        self.max_image_bytes = max_image_bytes
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="image-proxy"
+        )
+        self._pending = set()
+        self._lock = threading.Lock()
+        os.makedirs(variant_dir, exist_ok=True)
+        store.on_blob_removed = self._remove_variants
+
+    def fetch(self, url):
+        """
+        Make sure the URL's bytes are stored and fresh, revalidating with a
+        conditional GET when due. Returns the digest, or None on failure.
+        """
+        entry = self.store.get(url)
+        if entry and time.time() - entry["validated_at"] < self.revalidate_after:
+            return entry["digest"]
+
+        headers = {"User-Agent": IMAGE_PROXY_USER_AGENT}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.client.get(url, headers=headers, stream=True)
+        except Exception as e:
+            print(f"Image fetch failed for {url}: {e}")
+            # Keep serving the stale copy if there is one
+            return entry["digest"] if entry else None
+
+        with response:
+            if response.status_code == 304 and entry:
+                self.store.mark_validated(url)
+                return entry["digest"]
+            fallback = 400 <= response.status_code < 500 and original_url(url) != url
+            if response.status_code != 200 and not fallback:
+                print(f"Image fetch for {url} returned HTTP {response.status_code}")
+                return entry["digest"] if entry else None
+            if not fallback:
+                try:
+                    content = self._read_capped(response)
+                except Exception as e:
+                    print(f"Image fetch failed for {url}: {e}")
+                    return entry["digest"] if entry else None
+
+        if fallback:
+            # Commons refuses thumbnails wider than the original. The original
+            # is cached (and revalidated) under its own URL and the thumbnail
+            # URL is linked to its bytes.
+            digest = self.fetch(original_url(url))
+            if digest is None:
+                return entry["digest"] if entry else None
+            return self.store.link(url, digest)
+        if content is None:
+            print(f"Image at {url} is larger than {self.max_image_bytes} bytes; not cached")
+            return None
+
+        return self.store.put(
+            url,
+            content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def _read_capped(self, response):
+        """
+        Body of a streamed response, or None once it exceeds max_image_bytes.
+        A declared Content-Length over the cap is rejected before reading.
+        """
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_image_bytes:
+            return None
+
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > self.max_image_bytes:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def variant_path(self, digest, width):
+        return os.path.join(self.variant_dir, f"{digest[:20]}-{width}w.webp")
+
+    def ensure_variant(self, url, width):
+        """Fetch the image and write its resized variant; returns the variant path or None"""
+        digest = self.fetch(url)
+        if digest is None:
+            return None
+
+        path = self.variant_path(digest, width)
+        if os.path.exists(path):
+            return path
+
+        with Image.open(self.store.blob_path(digest)) as original:
+            original.load()
+            if original.width > width:
+                height = round(original.height * width / original.width)
+                image = original.resize((width, height), Image.LANCZOS)
+            else:
+                image = original
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+
+            with atomic_write(path, "wb") as f:
+                image.save(f, "WEBP", quality=IMAGE_DERIVATIVE_QUALITY)
+        return path
+
+    def _schedule(self, url, width):
+        key = (url, width)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        def run():
+            try:
+                self.ensure_variant(url, width)
+            except Exception as e:
+                print(f"Could not build image variant for {url}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self.executor.submit(run)
+
+    def proxied_url(self, url, width):
+        """Local static URL of the resized image, or the original URL until it is cached"""
+        if Image is None or not url or not url.startswith(("http://", "https://")):
+            return url
+
+        entry = self.store.get(url)
+        if entry:
+            path = self.variant_path(entry["digest"], width)
+            if os.path.exists(path):
+                if time.time() - entry["validated_at"] >= self.revalidate_after:
+                    self._schedule(url, width)
+                return static_url(path)
+
+        self._schedule(url, width)
+        return url
+
+    def _remove_variants(self, digest):
+        prefix = f"{digest[:20]}-"
+        for name in os.listdir(self.variant_dir):
+            if name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.variant_dir, name))
+                except OSError:
+                    pass
+
+
+@st.cache_resource
+def get_image_proxy():
+    """Process-wide image proxy shared by every session"""
+    return ImageProxy(
+        ImageStore(IMAGE_PROXY_ROOT, IMAGE_PROXY_MAX_BYTES), IMAGE_PROXY_VARIANT_DIR
+    )
+
+
+def proxied_image_url(url, width):
+    """URL to use in HTML for a remote image displayed at about `width` pixels"""
+    return get_image_proxy().proxied_url(url, width)
@@ -0,0 +1,69 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+from config.settings import DEFAULT_HOST_RATE_LIMIT, HOST_RATE_LIMITS
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """
+        Take one token, waiting for it to refill if necessary.
+        Returns False if no token became available within timeout seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so each upstream is rate limited independently."""
+
+    def __init__(self, limits=None, default_limit=DEFAULT_HOST_RATE_LIMIT):
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                rate, capacity = self.limits.get(host, self.default_limit)
+                self._buckets[host] = TokenBucket(rate, capacity)
+            return self._buckets[host]
+
+    def acquire(self, url_or_host, timeout=None):
+        """Wait for permission to send a request to the URL's host."""
+        host = urlparse(url_or_host).netloc or url_or_host
+        return self.bucket_for(host).acquire(timeout=timeout)
+
+
+# Shared limiter for all outbound requests made by the app
+host_rate_limiter = HostRateLimiter(HOST_RATE_LIMITS)
@@ -23,8 +23,12 @@ class StreamlitRouter:
         st.query_params.clear()
     
     @staticmethod
-    def generate_item_id(item):
+    def generate_item_id(item, disambiguate=True):
         """Generate a unique ID for an item."""
+        # Ids assigned by the catalog to items whose titles collide come first
+        if disambiguate and item.get('item_id'):
+            return str(item['item_id'])
+
         # Try to use existing ID first
         if 'id' in item and item['id']:
             return str(item['id'])
@@ -43,7 +47,7 @@ class StreamlitRouter:
         st.query_params.clear()
         st.session_state.view = 'home'
         st.session_state.selected_category = None
-        st.session_state.selected_item = None
+        st.session_state.selected_item_id = None
         st.rerun()
     
     @staticmethod
@@ -55,7 +59,7 @@ class StreamlitRouter:
         })
         st.session_state.view = 'category_detail'
         st.session_state.selected_category = category_id
-        st.session_state.selected_item = None
+        st.session_state.selected_item_id = None
         st.rerun()
     
     @staticmethod
@@ -69,7 +73,7 @@ class StreamlitRouter:
         })
         st.session_state.view = 'item_detail'
         st.session_state.selected_category = category_id
-        st.session_state.selected_item = item
+        st.session_state.selected_item_id = item_id
         st.rerun()
     
     @staticmethod
@@ -82,7 +86,7 @@ class StreamlitRouter:
                 "category": category_id
             })
             st.session_state.view = 'category_detail'
-            st.session_state.selected_item = None
+            st.session_state.selected_item_id = None
             st.rerun()
         else:
             StreamlitRouter.navigate_to_home()
@@ -103,42 +107,35 @@ class StreamlitRouter:
         if page == "home" or not page:
             st.session_state.view = 'home'
             st.session_state.selected_category = None
-            st.session_state.selected_item = None
+            st.session_state.selected_item_id = None
             
         elif page == "category" and category_id:
             if category_id in app_data:
                 st.session_state.view = 'category_detail'
                 st.session_state.selected_category = category_id
-                st.session_state.selected_item = None
+                st.session_state.selected_item_id = None
             else:
                 # Invalid category, set to home but don't navigate
                 st.session_state.view = 'home'
                 st.session_state.selected_category = None
-                st.session_state.selected_item = None
+                st.session_state.selected_item_id = None
                 st.query_params.clear()
                 
         elif page == "item" and category_id and item_id:
             if category_id in app_data:
-                # Find the item in the category
-                items = app_data[category_id].get('items', [])
-                selected_item = None
-                
-                for item in items:
-                    # Match by generated ID
-                    current_item_id = StreamlitRouter.generate_item_id(item)
-                    if current_item_id == item_id:
-                        selected_item = item
-                        break
+                # Look the item up in the catalog's prebuilt id index;
+                # only the id is kept in session state
+                selected_item = app_data.find_item(category_id, item_id)
                 
                 if selected_item:
                     st.session_state.view = 'item_detail'
                     st.session_state.selected_category = category_id
-                    st.session_state.selected_item = selected_item
+                    st.session_state.selected_item_id = item_id
                 else:
                     # Item not found, go to category
                     st.session_state.view = 'category_detail'
                     st.session_state.selected_category = category_id
-                    st.session_state.selected_item = None
+                    st.session_state.selected_item_id = None
                     st.query_params.update({
                         "page": "category",
                         "category": category_id
@@ -147,13 +144,13 @@ class StreamlitRouter:
                 # Invalid category, go to home
                 st.session_state.view = 'home'
                 st.session_state.selected_category = None
-                st.session_state.selected_item = None
+                st.session_state.selected_item_id = None
                 st.query_params.clear()
         else:
             # Invalid page, go to home
             st.session_state.view = 'home'
             st.session_state.selected_category = None
-            st.session_state.selected_item = None
+            st.session_state.selected_item_id = None
             st.query_params.clear()
 
 
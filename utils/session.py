@@ -1,4 +1,7 @@
+import pickle
+
 import streamlit as st
+from loaders.data_loader import get_catalog
 from utils.router import router
 
 
@@ -8,8 +11,9 @@ def initialize_session_state():
         st.session_state.view = "home"
     if "selected_category" not in st.session_state:
         st.session_state.selected_category = None
-    if "selected_item" not in st.session_state:
-        st.session_state.selected_item = None
+    # Only the item id is kept per session; the item lives in the shared catalog
+    if "selected_item_id" not in st.session_state:
+        st.session_state.selected_item_id = None
 
 
 def scroll_to_top():
@@ -82,9 +86,32 @@ def get_selected_category():
     return st.session_state.get("selected_category")
 
 
-def get_selected_item():
-    """Get the currently selected item."""
-    return st.session_state.get("selected_item")
+def get_selected_item(app_data=None):
+    """Resolve the selected (category_id, item_id) reference against the catalog."""
+    category_id = st.session_state.get("selected_category")
+    item_id = st.session_state.get("selected_item_id")
+    if not category_id or not item_id:
+        return None
+
+    if app_data is None:
+        app_data = get_catalog()
+    if app_data is None:
+        return None
+    return app_data.find_item(category_id, item_id)
+
+
+def session_state_bytes():
+    """
+    Diagnostic: approximate serialized size of each session state entry.
+    Returns {key: bytes}; values that can't be pickled are measured by repr().
+    """
+    sizes = {}
+    for key, value in st.session_state.items():
+        try:
+            sizes[key] = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            sizes[key] = len(repr(value).encode("utf-8"))
+    return sizes
 
 
 def set_view(view_name):
@@ -0,0 +1,95 @@
+import threading
+
+
+class _SharedStream:
+    """
+    Chunks produced by one generator, replayable by any number of readers.
+
+    Each reader starts from the first chunk and then follows the producer,
+    so a caller that joins late still receives the whole stream.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self._condition = threading.Condition()
+
+    def produce(self, iterator):
+        try:
+            for chunk in iterator:
+                with self._condition:
+                    self.chunks.append(chunk)
+                    self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.finished:
+                    self._condition.wait()
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                    index += 1
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            yield chunk
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the work; callers arriving while it is
+    in flight share its chunk stream instead of repeating it. Once the work
+    finishes the key is released, so later calls run again (normally
+    hitting a cache).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = {}
+        self.executions = 0
+        self.duplicates_avoided = 0
+
+    def stream(self, key, fn):
+        """
+        Iterate the chunks of fn() (a generator function), shared by all
+        concurrent callers with the same key. The generator runs on a
+        background thread so it completes even if the first reader stops.
+        """
+        with self._lock:
+            shared = self._streams.get(key)
+            if shared is None:
+                shared = self._streams[key] = _SharedStream()
+                self.executions += 1
+                threading.Thread(
+                    target=self._produce, args=(key, shared, fn), daemon=True
+                ).start()
+            else:
+                self.duplicates_avoided += 1
+
+        return iter(shared)
+
+    def _produce(self, key, shared, fn):
+        try:
+            shared.produce(fn())
+        finally:
+            with self._lock:
+                del self._streams[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._streams),
+                "executions": self.executions,
+                "duplicates_avoided": self.duplicates_avoided,
+            }
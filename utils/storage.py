@@ -0,0 +1,38 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def sqlite_connection(path, timeout=30):
+    """SQLite connection that commits on success, rolls back on error and is always closed"""
+    conn = sqlite3.connect(path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """
+    Open a temporary file next to `path` and move it into place once the
+    block succeeds, so readers never see a partial file. The directory is
+    created if needed; on error the temporary file is removed.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    encoding = None if "b" in mode else "utf-8"
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,210 @@
+"""
+Pre-generate stories for every catalog item so interactive users are
+served from the story cache instead of waiting on live generation.
+
+Items whose cached story is still fresh are skipped, and finished titles
+are recorded in a checkpoint so an interrupted run resumes where it
+stopped.
+
+Run from the repository root:
+    python -m utils.story_batch [--source local|snowflake] [--workers 4]
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.settings import (
+    DATA_ROOT,
+    STORY_BATCH_CHECKPOINT_PATH,
+    STORY_BATCH_WORKERS,
+)
+from utils.storage import atomic_write
+from utils.story_gen import (
+    StoryGenerationError,
+    get_story_cache,
+    get_story_generator,
+    prompt_template_for,
+    prompt_version,
+)
+
+
+def local_items(data_root=DATA_ROOT):
+    """Item records from the JSON files under data/"""
+    items = []
+    for path in sorted(glob.glob(os.path.join(data_root, "*", "*", "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                item = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if item.get("title"):
+            items.append(item)
+    return items
+
+
+def snowflake_items():
+    """Full item records from every category table in Snowflake"""
+    from loaders.data_loader import load_catalog_full, load_full_item
+
+    result = load_catalog_full()
+    if result is None:
+        raise SystemExit("Could not load the catalog from Snowflake")
+
+    app_data, _ = result
+    return [
+        load_full_item(category_id, item)
+        for category_id, category_info in app_data.items()
+        for item in category_info.get("items", [])
+        if item.get("title")
+    ]
+
+
+class Checkpoint:
+    """
+    Titles already processed in this run, persisted after every item.
+
+    Entries are (title, prompt version) pairs; a checkpoint written for
+    another model is ignored, since its stories would no longer be served.
+    """
+
+    def __init__(self, path, model_name):
+        self.path = path
+        self.model_name = model_name
+        self.done = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable checkpoint {path}: {e}")
+                return
+            if state.get("model_name") == model_name:
+                self.done = {tuple(entry) for entry in state.get("done", [])}
+
+    def is_done(self, title, version):
+        return (title, version) in self.done
+
+    def mark_done(self, title, version):
+        with self._lock:
+            self.done.add((title, version))
+            self._write()
+
+    def _write(self):
+        state = {
+            "model_name": self.model_name,
+            "done": sorted(self.done),
+        }
+        # An interrupted run never leaves a partial checkpoint
+        with atomic_write(self.path) as f:
+            json.dump(state, f)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def pregenerate(items, workers, checkpoint_path, force=False):
+    """Generate and cache stories for catalog items. Returns a summary dict."""
+    generator = get_story_generator()
+    if not generator.model:
+        raise SystemExit("Story generation is not available. Check the API key.")
+
+    cache = get_story_cache()
+    checkpoint = Checkpoint(checkpoint_path, generator.model_name)
+
+    counts = {"generated": 0, "skipped": 0, "failed": 0}
+    pending = []
+    seen = set()
+    for item in items:
+        # Stories are cached per title, so each title is generated once
+        title = item["title"]
+        if title in seen:
+            continue
+        seen.add(title)
+
+        version = prompt_version(prompt_template_for(item))
+        if not force and (
+            checkpoint.is_done(title, version)
+            or cache.is_fresh(title, version, generator.model_name)
+        ):
+            counts["skipped"] += 1
+        else:
+            pending.append((title, item, version))
+
+    print(
+        f"{len(pending)} stories to generate, {counts['skipped']} already cached "
+        f"({workers} workers, model {generator.model_name})"
+    )
+
+    def generate_one(title, item, version):
+        story = generator.generate_story_text(title, item)
+        cache.put(title, version, generator.model_name, story)
+        return len(story)
+
+    started = time.monotonic()
+    generated_chars = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_one, *entry): entry for entry in pending}
+        for index, future in enumerate(as_completed(futures), start=1):
+            title, _, version = futures[future]
+            try:
+                generated_chars += future.result()
+            except StoryGenerationError as e:
+                counts["failed"] += 1
+                print(f"[{index}/{len(pending)}] failed: {title}: {e}")
+                continue
+
+            counts["generated"] += 1
+            checkpoint.mark_done(title, version)
+            elapsed = time.monotonic() - started
+            print(
+                f"[{index}/{len(pending)}] {title} "
+                f"({counts['generated'] / elapsed * 60:.1f} stories/min)"
+            )
+
+    elapsed = time.monotonic() - started
+    if not counts["failed"]:
+        # Every title is cached now; the next run starts from the cache alone
+        checkpoint.clear()
+
+    return {
+        **counts,
+        "elapsed": elapsed,
+        "stories_per_minute": counts["generated"] / elapsed * 60 if elapsed else 0.0,
+        "chars_per_second": generated_chars / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=["local", "snowflake"], default="local")
+    parser.add_argument("--workers", type=int, default=STORY_BATCH_WORKERS)
+    parser.add_argument("--checkpoint", default=STORY_BATCH_CHECKPOINT_PATH)
+    parser.add_argument("--limit", type=int, help="Only process the first N items")
+    parser.add_argument(
+        "--force", action="store_true", help="Regenerate stories even if cached"
+    )
+    args = parser.parse_args()
+
+    items = local_items() if args.source == "local" else snowflake_items()
+    if args.limit:
+        items = items[: args.limit]
+
+    summary = pregenerate(items, args.workers, args.checkpoint, force=args.force)
+    print(
+        f"Done in {summary['elapsed']:.1f}s: {summary['generated']} generated, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed "
+        f"({summary['stories_per_minute']:.1f} stories/min, "
+        f"{summary['chars_per_second']:.0f} chars/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
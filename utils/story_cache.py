@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+import time
+
+from utils.storage import sqlite_connection
+
+
+def story_cache_key(title, prompt_version, model_name):
+    """Cache key for a story: item title, prompt template version and model."""
+    raw = "\x1f".join([title or "", prompt_version or "", model_name or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class StoryCache:
+    """
+    Disk-backed story cache shared by every session and surviving restarts.
+
+    Entries expire after `ttl` seconds. When the cache grows past
+    `max_entries` or `max_bytes`, the least recently used stories are evicted.
+    """
+
+    def __init__(self, path, ttl, max_entries, max_bytes):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS stories (
+                    key TEXT PRIMARY KEY,
+                    title TEXT,
+                    prompt_version TEXT,
+                    model_name TEXT,
+                    story TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS stories_accessed ON stories (accessed_at)"
+            )
+
+    def get(self, title, prompt_version, model_name):
+        """Return the cached story, or None if missing or expired."""
+        key = story_cache_key(title, prompt_version, model_name)
+        now = time.time()
+
+        with self._lock, sqlite_connection(self.path) as conn:
+            row = conn.execute(
+                "SELECT story, created_at FROM stories WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            story, created_at = row
+            if now - created_at >= self.ttl:
+                conn.execute("DELETE FROM stories WHERE key = ?", (key,))
+                return None
+
+            conn.execute(
+                "UPDATE stories SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return story
+
+    def is_fresh(self, title, prompt_version, model_name):
+        """True if a story is cached and has not expired (without touching LRU order)."""
+        key = story_cache_key(title, prompt_version, model_name)
+        with self._lock, sqlite_connection(self.path) as conn:
+            row = conn.execute(
+                "SELECT created_at FROM stories WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.ttl
+
+    def put(self, title, prompt_version, model_name, story):
+        """Store a story and evict old entries if the cache is over its limits."""
+        key = story_cache_key(title, prompt_version, model_name)
+        now = time.time()
+        size = len(story.encode("utf-8"))
+
+        with self._lock, sqlite_connection(self.path) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO stories
+                    (key, title, prompt_version, model_name, story, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, title, prompt_version, model_name, story, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM stories WHERE created_at <= ?", (now - self.ttl,))
+
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM stories"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Walk from least to most recently used until back under both limits
+        to_delete = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM stories ORDER BY accessed_at ASC"
+        ).fetchall():
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            count -= 1
+            total_bytes -= size
+
+        conn.executemany("DELETE FROM stories WHERE key = ?", to_delete)
+
+    def stats(self):
+        """Return entry count and total stored bytes."""
+        with self._lock, sqlite_connection(self.path) as conn:
+            count, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM stories"
+            ).fetchone()
+        return {"entries": count, "bytes": total_bytes}
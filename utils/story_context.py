@@ -0,0 +1,133 @@
+import re
+
+from config.settings import (
+    STORY_CONTEXT_CHARS_PER_TOKEN,
+    STORY_CONTEXT_DUPLICATE_THRESHOLD,
+    STORY_CONTEXT_SHINGLE_SIZE,
+    STORY_CONTEXT_TOKEN_BUDGET,
+)
+
+WORD_RE = re.compile(r"\w+")
+
+# Terms too common to say anything about relevance
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "with",
+}
+
+
+def estimate_tokens(text):
+    """Rough token count used for budgeting (characters / chars-per-token)"""
+    return len(text) // STORY_CONTEXT_CHARS_PER_TOKEN + 1
+
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def shingles(text, size=STORY_CONTEXT_SHINGLE_SIZE):
+    """Set of overlapping word n-grams of a text"""
+    tokens = words(text)
+    if len(tokens) <= size:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def dedupe_snippets(snippets, threshold=STORY_CONTEXT_DUPLICATE_THRESHOLD):
+    """
+    Drop snippets whose shingle set is nearly identical to an earlier one.
+    Snippets are (source, text) pairs; returns (kept, dropped_count).
+    """
+    kept = []
+    kept_shingles = []
+    for source, text in snippets:
+        text_shingles = shingles(text)
+        if not text_shingles:
+            continue
+        if any(jaccard(text_shingles, seen) >= threshold for seen in kept_shingles):
+            continue
+        kept.append((source, text))
+        kept_shingles.append(text_shingles)
+    return kept, len(snippets) - len(kept)
+
+
+def query_terms(art_name, item=None):
+    """Terms describing the item: its title plus related topics and figures"""
+    parts = [art_name]
+    if item:
+        for field in ("related_topics", "important_figures", "categories"):
+            value = item.get(field)
+            if isinstance(value, (list, tuple)):
+                parts.extend(str(entry) for entry in value)
+            elif value:
+                parts.append(str(value))
+    return {term for term in words(" ".join(parts)) if term not in STOPWORDS}
+
+
+def relevance(text, terms):
+    """Share of the query terms mentioned in a snippet"""
+    if not terms:
+        return 0.0
+    snippet_terms = set(words(text))
+    return len(terms & snippet_terms) / len(terms)
+
+
+def build_context(art_name, snippets, item=None, budget=STORY_CONTEXT_TOKEN_BUDGET):
+    """
+    Deduplicate, rank and pack (source, text) snippets into a token budget.
+
+    Returns (packed_snippets, stats). Packed snippets keep their original
+    order so related sources stay together in the prompt.
+    """
+    unique, duplicates = dedupe_snippets(snippets)
+
+    title_terms = set(words(art_name)) - STOPWORDS
+    terms = query_terms(art_name, item)
+    ranked = sorted(
+        range(len(unique)),
+        key=lambda index: (
+            relevance(unique[index][1], title_terms),
+            relevance(unique[index][1], terms),
+        ),
+        reverse=True,
+    )
+
+    chosen = set()
+    used = 0
+    irrelevant = 0
+    for index in ranked:
+        if terms and relevance(unique[index][1], terms) == 0:
+            # Mentions nothing about the item; not worth any budget
+            irrelevant += 1
+            continue
+        cost = estimate_tokens(unique[index][1])
+        if used + cost > budget:
+            continue
+        chosen.add(index)
+        used += cost
+
+    packed = [unique[index] for index in sorted(chosen)]
+    stats = {
+        "snippets": len(snippets),
+        "duplicates": duplicates,
+        "irrelevant": irrelevant,
+        "packed": len(packed),
+        "context_tokens": used,
+    }
+    return packed, stats
+
+
+def format_context(packed, headings):
+    """Group packed snippets under a heading per source, in `headings` order"""
+    sections = []
+    for source, heading in headings:
+        texts = [text for snippet_source, text in packed if snippet_source == source]
+        if texts:
+            sections.append(f"{heading}:\n" + "\n".join(texts) + "\n")
+    return "\n".join(sections)
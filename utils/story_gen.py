@@ -5,8 +5,110 @@ import wikipedia
 import requests
 from bs4 import BeautifulSoup
 import json
+import hashlib
 from urllib.parse import quote_plus
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from config.settings import (
+    STORY_EVIDENCE_WORKERS,
+    STORY_EVIDENCE_DEADLINE,
+    STORY_CACHE_PATH,
+    STORY_CACHE_TTL,
+    STORY_CACHE_MAX_ENTRIES,
+    STORY_CACHE_MAX_BYTES,
+    STORY_GROUNDING,
+)
+from utils.story_cache import StoryCache
+from utils.rate_limit import host_rate_limiter
+from utils.http_client import http_client
+from utils.stub_model import StubGenerativeModel
+from utils.single_flight import SingleFlight
+from utils.admission import (
+    AdmissionRejected,
+    QueuePosition,
+    is_rate_limit_error,
+    llm_admission,
+)
+from utils.story_context import build_context, estimate_tokens, format_context
+
+WIKIPEDIA_HOST = "en.wikipedia.org"
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+STORY_PROMPT_TEMPLATE = """
+Create a compelling story about {art_name} using the following information:
+
+{context}
+Please create a well-structured story that:
+1. Introduces the art/culture
+2. Explains its historical significance
+3. Describes its cultural impact
+4. Includes interesting facts and details
+5. Concludes with its modern relevance
+
+Format the story in a clear, engaging narrative style.
+Incorporate relevant information from the existing stories while maintaining originality.
+"""
+
+LOCAL_STORY_PROMPT_TEMPLATE = """
+Create a compelling story about {art_name} using the following curated information:
+
+{item_facts}
+Please create a well-structured story that:
+1. Introduces the art/culture
+2. Explains its historical significance
+3. Describes its cultural impact
+4. Includes interesting facts and details
+5. Concludes with its modern relevance
+
+Format the story in a clear, engaging narrative style.
+Stay faithful to the information above and do not invent dates, names or places.
+"""
+
+# Prompt headings for each evidence source, in prompt order
+EVIDENCE_HEADINGS = [
+    ("wikipedia", "Wikipedia Information"),
+    ("web", "Additional Web Information"),
+    ("news", "Existing Stories and Articles"),
+]
+
+# Item fields used to ground stories in local mode, with their prompt headings
+GROUNDING_FIELDS = [
+    ("summary", "Summary"),
+    ("key_points", "Key Points"),
+    ("timeline", "Timeline"),
+    ("important_figures", "Important Figures"),
+    ("related_topics", "Related Topics"),
+]
+
+
+def prompt_version(template):
+    """Short hash identifying a prompt template, used in story cache keys"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def prompt_template_for(item=None):
+    """Prompt template used for an item under the configured grounding mode"""
+    if STORY_GROUNDING == "local" and item:
+        return LOCAL_STORY_PROMPT_TEMPLATE
+    return STORY_PROMPT_TEMPLATE
+
+
+def format_item_facts(item):
+    """Render the grounding fields of an item as prompt sections"""
+    sections = []
+    for field, heading in GROUNDING_FIELDS:
+        value = item.get(field)
+        if not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            body = "\n".join(f"- {entry}" for entry in value if entry)
+        else:
+            body = str(value)
+        sections.append(f"{heading}:\n{body}\n")
+    return "\n".join(sections)
+
 
 # Load environment variables
 load_dotenv()
@@ -29,14 +131,32 @@ else:
         print(f"Error configuring Gemini API: {e}")
         GENAI_CONFIGURED = False
 
+# "stub" swaps Gemini for an offline model that streams a canned story
+STORY_MODEL = os.getenv("STORY_MODEL", "gemini")
+
+STORY_BUSY_MESSAGE = (
+    "Story generation is busy right now. Please try again in a moment."
+)
+
+# Seconds between queue position updates while waiting for a model slot
+QUEUE_POLL_INTERVAL = 0.5
+
+
+class StoryGenerationError(Exception):
+    """Raised when the model fails to produce a story."""
+
 
 class StoryGenerator:
     def __init__(self):
         self.model = None
-        if GENAI_CONFIGURED:
+        self.model_name = MODEL_NAME
+        if STORY_MODEL == "stub":
+            self.model = StubGenerativeModel()
+            self.model_name = StubGenerativeModel.model_name
+        elif GENAI_CONFIGURED:
             try:
                 # Use a suitable model, 'gemini-pro' is generally available
-                self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
+                self.model = genai.GenerativeModel(MODEL_NAME)
             except Exception as e:
                 print(f"Error initializing Gemini model: {e}")
                 self.model = None
@@ -45,27 +165,38 @@ class StoryGenerator:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
 
+        # Shared pool for concurrent evidence gathering
+        self.executor = ThreadPoolExecutor(
+            max_workers=STORY_EVIDENCE_WORKERS, thread_name_prefix="story-evidence"
+        )
+
     def search_wikipedia(self, query):
-        """Search Wikipedia for information about the art/culture"""
+        """
+        Search Wikipedia for information about the art/culture. Returns None
+        when there is no usable summary, so failures never reach the prompt.
+        """
         try:
+            host_rate_limiter.acquire(WIKIPEDIA_HOST)
             # Use wikipedia library directly
             return wikipedia.summary(
                 query, sentences=3, auto_suggest=False, redirect=True
             )
         except wikipedia.exceptions.PageError:
-            return f"No Wikipedia page found for {query}."
+            print(f"No Wikipedia page found for {query}.")
         except wikipedia.exceptions.DisambiguationError as e:
-            return f"Wikipedia search for {query} is ambiguous. Possible options: {e.options[:5]}."
+            print(f"Wikipedia search for {query} is ambiguous. Possible options: {e.options[:5]}.")
         except Exception as e:
-            return f"Error searching Wikipedia: {e}"
+            print(f"Error searching Wikipedia for {query}: {e}")
+        return None
 
     def search_web(self, query):
-        """Search the web for additional information"""
+        """Search the web for additional information, or return None if nothing was found"""
         try:
             # Using a simplified web search approach for demonstration
             # A more robust approach would use a dedicated search API
-            response = requests.get(
-                f"https://www.google.com/search?q={quote_plus(query)}+art+history+culture",
+            # The shared client applies the per-host rate limit, timeouts and retries
+            response = http_client.get(
+                f"{GOOGLE_SEARCH_URL}?q={quote_plus(query)}+art+history+culture",
                 headers=self.headers,
             )
             response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
@@ -77,105 +208,194 @@ class StoryGenerator:
                 snippet_element = item.select_one(".VwiC3b")
                 if snippet_element:
                     snippets.append(snippet_element.get_text())
-            return (
-                " ".join(snippets[:3])
-                if snippets
-                else "No relevant web snippets found."
-            )
+            return " ".join(snippets[:3]) if snippets else None
         except requests.exceptions.RequestException as e:
-            return f"Error during web search: {e}"
+            print(f"Error during web search for {query}: {e}")
         except Exception as e:
-            return f"An unexpected error occurred during web search: {e}"
+            print(f"An unexpected error occurred during web search for {query}: {e}")
+        return None
 
-    def gather_existing_stories(self, query):
-        """Gather existing stories and articles about the art/culture"""
-        stories = []
-        search_terms = [
+    def news_search_terms(self, query):
+        """Search terms used to find existing stories about the art/culture"""
+        return [
             f"{query} story",
             f"{query} history",
             f"{query} cultural significance",
             f"{query} art analysis",
         ]
 
-        for term in search_terms:
-            try:
-                # Search for articles (using Google News search)
-                response = requests.get(
-                    f"https://www.google.com/search?q={quote_plus(term)}&tbm=nws",
-                    headers=self.headers,
-                )
-                response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Extract news/article results
-                # Use a more general selector for news results
-                articles = soup.select(".SoaBEf")
-                for article in articles[:2]:  # Limit to 2 articles per search term
-                    title_element = article.select_one(".n0jPhd")
-                    snippet_element = article.select_one(".GI74Re")
-                    if title_element and snippet_element:
-                        title = title_element.get_text()
-                        snippet = snippet_element.get_text()
-                        stories.append(f"Title: {title}\nContent: {snippet}\n")
-
-                # Add delay to avoid rate limiting and respect servers
-                time.sleep(1)
-
-            except requests.exceptions.RequestException as e:
-                print(f"Error during news search for {term}: {e}")
-                continue
-            except Exception as e:
-                print(
-                    f"An unexpected error occurred during news search for {term}: {e}"
-                )
-                continue
+    def search_news(self, term):
+        """Search news articles for one term, returning formatted stories"""
+        stories = []
+        try:
+            # Search for articles (using Google News search)
+            response = http_client.get(
+                f"{GOOGLE_SEARCH_URL}?q={quote_plus(term)}&tbm=nws",
+                headers=self.headers,
+            )
+            response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
+            soup = BeautifulSoup(response.text, "html.parser")
 
-        return "\n".join(stories) if stories else "No existing stories found."
+            # Extract news/article results
+            # Use a more general selector for news results
+            articles = soup.select(".SoaBEf")
+            for article in articles[:2]:  # Limit to 2 articles per search term
+                title_element = article.select_one(".n0jPhd")
+                snippet_element = article.select_one(".GI74Re")
+                if title_element and snippet_element:
+                    title = title_element.get_text()
+                    snippet = snippet_element.get_text()
+                    stories.append(f"Title: {title}\nContent: {snippet}\n")
 
-    def generate_story_content(self, art_name):
-        """Generate a story using the gathered information using Gemini"""
-        if not self.model:
-            return "Story generation is not available due to missing API key or model initialization failure."
+        except requests.exceptions.RequestException as e:
+            print(f"Error during news search for {term}: {e}")
+        except Exception as e:
+            print(f"An unexpected error occurred during news search for {term}: {e}")
 
-        # Gather information
-        wiki_info = self.search_wikipedia(art_name)
-        web_info = self.search_web(art_name)
-        existing_stories = self.gather_existing_stories(art_name)
+        return stories
 
-        # Create prompt for story generation
-        prompt = f"""
-Create a compelling story about {art_name} using the following information:
+    def gather_evidence(self, art_name, deadline=STORY_EVIDENCE_DEADLINE):
+        """
+        Run Wikipedia, web and news searches concurrently. Returns
+        (wiki_info, web_info, stories) from whatever sources have answered
+        once `deadline` seconds have passed; sources that did not answer
+        or found nothing are None (or an empty list of stories).
+        """
+        wiki_future = self.executor.submit(self.search_wikipedia, art_name)
+        web_future = self.executor.submit(self.search_web, art_name)
+        news_futures = [
+            self.executor.submit(self.search_news, term)
+            for term in self.news_search_terms(art_name)
+        ]
 
-Wikipedia Information:
-{wiki_info}
+        wait([wiki_future, web_future, *news_futures], timeout=deadline)
 
-Additional Web Information:
-{web_info}
+        def result_or(future, fallback):
+            return future.result() if future.done() else fallback
 
-Existing Stories and Articles:
-{existing_stories}
+        wiki_info = result_or(wiki_future, None)
+        web_info = result_or(web_future, None)
+        stories = [story for future in news_futures for story in result_or(future, [])]
 
-Please create a well-structured story that:
-1. Introduces the art/culture
-2. Explains its historical significance
-3. Describes its cultural impact
-4. Includes interesting facts and details
-5. Concludes with its modern relevance
+        return wiki_info, web_info, stories
 
-Format the story in a clear, engaging narrative style.
-Incorporate relevant information from the existing stories while maintaining originality.
-"""
+    def evidence_context(self, art_name, evidence, item=None):
+        """Dedupe, rank and pack evidence into the context budget"""
+        wiki_info, web_info, stories = evidence
+        snippets = [
+            ("wikipedia", wiki_info),
+            ("web", web_info),
+            *(("news", story) for story in stories),
+        ]
+        snippets = [(source, text) for source, text in snippets if text]
+        packed, stats = build_context(art_name, snippets, item)
+        return format_context(packed, EVIDENCE_HEADINGS), stats
+
+    def build_local_prompt(self, art_name, item):
+        """Fill in the story prompt from the item's own fields, without network calls"""
+        prompt = LOCAL_STORY_PROMPT_TEMPLATE.format(
+            art_name=art_name, item_facts=format_item_facts(item)
+        )
+        return prompt, None
+
+    def build_prompt(self, art_name, item=None):
+        """Build the story prompt, from the item record or from live web evidence"""
+        if prompt_template_for(item) is LOCAL_STORY_PROMPT_TEMPLATE:
+            prompt, stats = self.build_local_prompt(art_name, item)
+        else:
+            # Gather evidence concurrently, bounded by the evidence deadline
+            evidence = self.gather_evidence(art_name)
+            context, stats = self.evidence_context(art_name, evidence, item)
+            prompt = STORY_PROMPT_TEMPLATE.format(
+                art_name=art_name,
+                context=context or "No external information was found.\n",
+            )
+
+        # Log prompt size so the context budget can be tuned
+        snippet_note = (
+            f", {stats['packed']}/{stats['snippets']} snippets packed "
+            f"({stats['duplicates']} near-duplicates, {stats['irrelevant']} irrelevant dropped)"
+            if stats
+            else ""
+        )
+        print(
+            f"Story prompt for {art_name}: {len(prompt)} chars "
+            f"(~{estimate_tokens(prompt)} tokens){snippet_note}"
+        )
+        return prompt
+
+    def _record_failure(self, error):
+        # Provider rate limits shrink the shared concurrency limit
+        if is_rate_limit_error(error):
+            llm_admission.record_rate_limit()
+
+    def _require_model(self):
+        if not self.model:
+            raise StoryGenerationError(
+                "Story generation is not available due to missing API key or model initialization failure."
+            )
 
+    def generate_story_text(self, art_name, item=None):
+        """
+        Generate a story using the gathered information using Gemini.
+        Raises StoryGenerationError if no story could be produced.
+        """
+        self._require_model()
+        prompt = self.build_prompt(art_name, item)
+
+        try:
+            # Wait for a model slot shared by every session
+            with llm_admission.admit():
+                response = self.model.generate_content(prompt)
+        except AdmissionRejected:
+            raise StoryGenerationError(STORY_BUSY_MESSAGE)
+        except Exception as e:
+            self._record_failure(e)
+            raise StoryGenerationError(f"Error generating story with Gemini: {e}")
+        llm_admission.record_success()
+
+        # Check if response has text attribute and is not empty
+        if hasattr(response, "text") and response.text.strip():
+            return response.text
+        raise StoryGenerationError("Gemini generated an empty response.")
+
+    def stream_story_text(self, art_name, item=None):
+        """
+        Yield the story in chunks as the model produces them. While waiting
+        for a model slot, QueuePosition markers are yielded instead of text.
+        Raises StoryGenerationError if the stream fails or yields nothing.
+        """
+        self._require_model()
+        prompt = self.build_prompt(art_name, item)
+
+        try:
+            ticket = llm_admission.enqueue()
+        except AdmissionRejected:
+            raise StoryGenerationError(STORY_BUSY_MESSAGE)
+
+        produced = False
         try:
-            # Generate story using Gemini
-            response = self.model.generate_content(prompt)
-            # Check if response has text attribute and is not empty
-            if hasattr(response, "text") and response.text.strip():
-                return response.text
-            else:
-                return "Gemini generated an empty response."
+            while not llm_admission.try_start(ticket, timeout=QUEUE_POLL_INTERVAL):
+                yield QueuePosition(llm_admission.position(ticket))
+
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata) are skipped
+                    continue
+                if text:
+                    produced = True
+                    yield text
         except Exception as e:
-            return f"Error generating story with Gemini: {e}"
+            self._record_failure(e)
+            raise StoryGenerationError(f"Error generating story with Gemini: {e}")
+        finally:
+            llm_admission.release(ticket)
+        llm_admission.record_success()
+
+        if not produced:
+            raise StoryGenerationError("Gemini generated an empty response.")
 
 
 # Instantiate the generator (singleton pattern for Streamlit)
@@ -190,16 +410,67 @@ def get_story_generator():
     return story_generator_instance
 
 
-def generate_story(title):
-    """Generate a story for the given title using the StoryGenerator.
-    This is the function called from item_detail.py"""
-    generator = get_story_generator()
-    # Simulate latency moved inside the actual generation call if needed, or keep for effect
-    # time.sleep(2)
-    # Ensure generator is initialized before calling generate_story_content
-    if generator and generator.model:
-        return generator.generate_story_content(title)
-    else:
-        return (
-            "Story generation is not available. Please check API key and configuration."
+story_cache_instance = None
+
+# Coalesces concurrent generations of the same story
+story_flight = SingleFlight()
+
+
+def get_story_cache():
+    global story_cache_instance
+    if story_cache_instance is None:
+        story_cache_instance = StoryCache(
+            STORY_CACHE_PATH,
+            ttl=STORY_CACHE_TTL,
+            max_entries=STORY_CACHE_MAX_ENTRIES,
+            max_bytes=STORY_CACHE_MAX_BYTES,
         )
+    return story_cache_instance
+
+
+def stream_story(title, item=None):
+    """Yield the story for the given title chunk by chunk.
+    Cached stories are yielded whole; fresh ones are cached once complete.
+    QueuePosition markers are yielded while waiting for a model slot."""
+    generator = get_story_generator()
+    cache = get_story_cache()
+    version = prompt_version(prompt_template_for(item))
+    cached_story = cache.get(title, version, generator.model_name)
+    if cached_story is not None:
+        yield cached_story
+        return
+
+    if not (generator and generator.model):
+        yield "Story generation is not available. Please check API key and configuration."
+        return
+
+    # Concurrent requests for the same story share one generation and its stream
+    yield from story_flight.stream(
+        (title, version, generator.model_name),
+        lambda: _generate_story_stream(generator, cache, title, item, version),
+    )
+
+
+def _generate_story_stream(generator, cache, title, item, version):
+    """Stream a freshly generated story and cache it once complete"""
+    started = time.monotonic()
+    chunks = []
+    try:
+        for chunk in generator.stream_story_text(title, item):
+            if isinstance(chunk, QueuePosition):
+                # Pass queue updates through without adding them to the story
+                yield chunk
+                continue
+            if not chunks:
+                print(
+                    f"Story for {title}: first chunk after {time.monotonic() - started:.2f}s"
+                )
+            chunks.append(chunk)
+            yield chunk
+    except StoryGenerationError as e:
+        # Errors are shown to the user but never cached
+        yield f"\n\n{e}" if chunks else str(e)
+        return
+
+    print(f"Story for {title}: completed in {time.monotonic() - started:.2f}s")
+    cache.put(title, version, generator.model_name, "".join(chunks))
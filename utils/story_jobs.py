@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import (
+    STORY_JOB_DB_PATH,
+    STORY_JOB_PARTIAL_FLUSH_INTERVAL,
+    STORY_JOB_RETENTION,
+    STORY_JOB_WORKERS,
+)
+from utils.admission import QueuePosition
+from utils.story_cache import story_cache_key
+from utils.storage import sqlite_connection
+from utils.story_gen import (
+    get_story_cache,
+    get_story_generator,
+    prompt_template_for,
+    prompt_version,
+    stream_story,
+)
+
+JOB_COLUMNS = [
+    "id",
+    "title",
+    "item",
+    "status",
+    "queue_position",
+    "partial",
+    "result",
+    "error",
+    "created_at",
+    "updated_at",
+]
+
+
+class StoryJobQueue:
+    """
+    SQLite-backed table of story generation jobs.
+
+    Each job is identified by its story cache key, so every session asking
+    for the same story shares one job. Status moves from queued to running
+    to done or failed; partial text is stored while the story streams.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with sqlite_connection(self.path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    item TEXT,
+                    status TEXT NOT NULL,
+                    queue_position INTEGER,
+                    partial TEXT NOT NULL DEFAULT '',
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, job_id):
+        """Return a job as a dict, or None"""
+        with sqlite_connection(self.path) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+    def create(self, job_id, title, item):
+        """Insert a queued job, replacing a finished one with the same id"""
+        now = time.time()
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO jobs
+                    (id, title, item, status, partial, created_at, updated_at)
+                VALUES (?, ?, ?, 'queued', '', ?, ?)
+                """,
+                (job_id, title, json.dumps(item, default=str), now, now),
+            )
+
+    def update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def unfinished(self):
+        """Jobs left queued or running, e.g. by a previous process"""
+        with sqlite_connection(self.path) as conn:
+            rows = conn.execute(
+                "SELECT id, title, item FROM jobs WHERE status IN ('queued', 'running') "
+                "ORDER BY created_at"
+            ).fetchall()
+        return [(job_id, title, json.loads(item) if item else None) for job_id, title, item in rows]
+
+    def prune(self, max_age):
+        """Delete finished jobs older than max_age seconds"""
+        with sqlite_connection(self.path) as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (time.time() - max_age,),
+            )
+
+
+class StoryWorker:
+    """
+    Generates stories on a thread pool, outside the Streamlit script thread.
+
+    Pages submit a job and poll it; the job keeps running if the user
+    navigates away, and its result (or partial text) is read back from the
+    job queue on the next visit. Unfinished jobs are resumed on startup.
+    """
+
+    def __init__(self, queue, workers=STORY_JOB_WORKERS):
+        self.queue = queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="story-worker"
+        )
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._scheduled = set()
+
+        for job_id, title, item in queue.unfinished():
+            self.queue.update(job_id, status="queued")
+            self._schedule(job_id, title, item)
+
+    def job_id(self, title, item=None):
+        return story_cache_key(
+            title,
+            prompt_version(prompt_template_for(item)),
+            get_story_generator().model_name,
+        )
+
+    def find(self, title, item=None):
+        """Return the job for this story, or None if none was submitted"""
+        return self.queue.get(self.job_id(title, item))
+
+    def submit(self, title, item=None):
+        """Start generating a story unless a job for it is already pending or done"""
+        job_id = self.job_id(title, item)
+        with self._submit_lock:
+            job = self.queue.get(job_id)
+            if job and job["status"] in ("queued", "running", "done"):
+                return job_id
+
+            item = dict(item) if item else None
+            self.queue.prune(STORY_JOB_RETENTION)
+            self.queue.create(job_id, title, item)
+        self._schedule(job_id, title, item)
+        return job_id
+
+    def _schedule(self, job_id, title, item):
+        with self._lock:
+            if job_id in self._scheduled:
+                return
+            self._scheduled.add(job_id)
+        self.executor.submit(self._run, job_id, title, item)
+
+    def _run(self, job_id, title, item):
+        try:
+            self.queue.update(job_id, status="running")
+            chunks = []
+            last_flush = None
+            for chunk in stream_story(title, item):
+                if isinstance(chunk, QueuePosition):
+                    self.queue.update(job_id, queue_position=chunk.position)
+                    continue
+                chunks.append(chunk)
+                # Store the first chunk at once, then partial text periodically
+                if (
+                    last_flush is None
+                    or time.monotonic() - last_flush >= STORY_JOB_PARTIAL_FLUSH_INTERVAL
+                ):
+                    self.queue.update(
+                        job_id, partial="".join(chunks), queue_position=None
+                    )
+                    last_flush = time.monotonic()
+
+            story = "".join(chunks)
+            if self._story_was_cached(title, item):
+                self.queue.update(job_id, status="done", partial=story, result=story)
+            else:
+                # stream_story reports failures as text and never caches them
+                self.queue.update(job_id, status="failed", partial="", error=story)
+        except Exception as e:
+            print(f"Story job for {title} failed: {e}")
+            self.queue.update(job_id, status="failed", error=str(e))
+        finally:
+            with self._lock:
+                self._scheduled.discard(job_id)
+
+    def _story_was_cached(self, title, item):
+        return get_story_cache().is_fresh(
+            title,
+            prompt_version(prompt_template_for(item)),
+            get_story_generator().model_name,
+        )
+
+
+story_worker_instance = None
+story_worker_lock = threading.Lock()
+
+
+def get_story_worker():
+    global story_worker_instance
+    with story_worker_lock:
+        if story_worker_instance is None:
+            story_worker_instance = StoryWorker(StoryJobQueue(STORY_JOB_DB_PATH))
+    return story_worker_instance
@@ -0,0 +1,47 @@
+import time
+
+
+class StubResponse:
+    """Minimal stand-in for a Gemini response or streamed chunk."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """
+    Offline stand-in for genai.GenerativeModel, selected with STORY_MODEL=stub.
+
+    generate_content(prompt, stream=True) yields the canned story in small
+    chunks with a delay between them, so streaming can be exercised (and
+    chunks observed arriving one by one) without an API key or network.
+    """
+
+    model_name = "stub"
+
+    def __init__(self, chunk_size=40, delay=0.05, text=None):
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.text = text
+
+    def _story_for(self, prompt):
+        if self.text is not None:
+            return self.text
+        first_line = next((line for line in prompt.splitlines() if line.strip()), "")
+        return (
+            f"{first_line.strip()}\n\n"
+            "This is a placeholder story produced by the stub model. "
+            "It introduces the subject, sketches its history and cultural impact, "
+            "and closes with a note on its relevance today."
+        )
+
+    def _chunks(self, text):
+        for start in range(0, len(text), self.chunk_size):
+            time.sleep(self.delay)
+            yield StubResponse(text[start : start + self.chunk_size])
+
+    def generate_content(self, prompt, stream=False):
+        text = self._story_for(prompt)
+        if stream:
+            return self._chunks(text)
+        return StubResponse(text)
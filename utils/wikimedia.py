@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+from urllib.parse import unquote
+
+from config.settings import IMAGE_THUMBNAIL_WIDTHS
+
+# https://upload.wikimedia.org/<project>/<lang>/[thumb/]<x>/<xy>/<File>[/<N>px-<File>]
+UPLOAD_URL_RE = re.compile(
+    r"^(?P<base>https?://upload\.wikimedia\.org/[^/]+/[^/]+/)"
+    r"(?:thumb/)?"
+    r"(?P<hash>[0-9a-f]/[0-9a-f]{2})/"
+    r"(?P<name>[^/?#]+)"
+    r"(?:/[^/?#]*)?$"
+)
+
+# File types Commons renders as plain width-bounded thumbnails
+THUMBNAIL_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
+
+# Longer file names are thumbnailed as "<N>px-thumbnail.<ext>" instead
+MAX_THUMBNAIL_NAME_BYTES = 160
+
+
+@lru_cache(maxsize=4096)
+def parse_upload_url(url):
+    """
+    Split a Commons upload URL into (original URL, thumbnail URL prefix,
+    thumbnail URL suffix), or None if it is not a thumbnailable file.
+    Parsed once per URL; every width is then a string concatenation.
+    """
+    match = UPLOAD_URL_RE.match(url or "")
+    if not match:
+        return None
+
+    name = match.group("name")
+    original = f"{match.group('base')}{match.group('hash')}/{name}"
+    if not name.lower().endswith(THUMBNAIL_EXTENSIONS):
+        return original, None, None
+    if len(unquote(name).encode("utf-8")) > MAX_THUMBNAIL_NAME_BYTES:
+        return original, None, None
+
+    # SVGs are rasterised, so their thumbnails get a .png suffix
+    suffix = ".png" if name.lower().endswith(".svg") else ""
+    prefix = f"{match.group('base')}thumb/{match.group('hash')}/{name}/"
+    return original, prefix, f"px-{name}{suffix}"
+
+
+def thumbnail_url(url, width):
+    """
+    Commons thumbnail URL of an upload.wikimedia.org image at `width`
+    pixels, or None if the URL is not a thumbnailable Commons file.
+    """
+    parsed = parse_upload_url(url)
+    if not parsed or parsed[1] is None:
+        return None
+    _, prefix, suffix = parsed
+    return f"{prefix}{width}{suffix}"
+
+
+def original_url(url):
+    """The full-size file URL behind a Commons thumbnail URL (other URLs unchanged)"""
+    parsed = parse_upload_url(url)
+    return parsed[0] if parsed else url
+
+
+def sized_image_url(item, index, width):
+    """
+    URL of the item's index-th image for display at `width` pixels: the
+    Commons thumbnail at the smallest of IMAGE_THUMBNAIL_WIDTHS that is at
+    least that wide, else the full-size original. Thumbnail URLs are a pure
+    function of (url, width), so they are derived here rather than stored
+    at ingest.
+    """
+    images = item.get("images") or []
+    if index >= len(images):
+        return None
+
+    url = images[index]
+    if not isinstance(url, str):
+        return url
+    for thumbnail_width in sorted(IMAGE_THUMBNAIL_WIDTHS):
+        if thumbnail_width >= width:
+            return thumbnail_url(url, thumbnail_width) or url
+    return original_url(url)